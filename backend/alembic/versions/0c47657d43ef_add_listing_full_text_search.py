@@ -0,0 +1,46 @@
+"""add listing full text search
+
+Revision ID: 0c47657d43ef
+Revises: c0b546b11594
+Create Date: 2025-08-16 11:05:47.831290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c47657d43ef'
+down_revision: Union[str, Sequence[str], None] = 'c0b546b11594'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add a generated tsvector over title/description with a GIN index (PostgreSQL only)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("""
+        ALTER TABLE listings ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+        ) STORED
+    """)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_listings_search_vector', 'listings', ['search_vector'],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Remove the full text search column and index."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_listings_search_vector', table_name='listings', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('listings', 'search_vector')
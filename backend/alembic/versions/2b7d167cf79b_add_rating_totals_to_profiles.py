@@ -0,0 +1,43 @@
+"""add rating totals to profiles
+
+Revision ID: 2b7d167cf79b
+Revises: c8288d1192e4
+Create Date: 2025-08-12 10:14:32.512904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b7d167cf79b'
+down_revision: Union[str, Sequence[str], None] = 'c8288d1192e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add rating_count/rating_sum to profiles and backfill them from reviews."""
+    op.add_column('profiles', sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('profiles', sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'))
+
+    # Same set-based recompute as app.utils.ratings.reconcile_ratings
+    op.execute("""
+        UPDATE profiles SET
+            rating_count = (SELECT COUNT(*) FROM reviews WHERE reviews.reviewee_id = profiles.user_id),
+            rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE reviews.reviewee_id = profiles.user_id)
+    """)
+    op.execute("""
+        UPDATE profiles SET average_rating = CASE
+            WHEN rating_count > 0 THEN rating_sum * 1.0 / rating_count
+            ELSE 0.0
+        END
+    """)
+
+
+def downgrade() -> None:
+    """Remove rating totals from profiles."""
+    op.drop_column('profiles', 'rating_sum')
+    op.drop_column('profiles', 'rating_count')
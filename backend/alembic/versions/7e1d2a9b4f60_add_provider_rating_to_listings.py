@@ -0,0 +1,50 @@
+"""add provider rating to listings
+
+Revision ID: 7e1d2a9b4f60
+Revises: 0c47657d43ef
+Create Date: 2025-08-16 14:22:09.518347
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e1d2a9b4f60'
+down_revision: Union[str, Sequence[str], None] = '0c47657d43ef'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Copy provider ratings onto listings and index them for rating filters."""
+    op.add_column('listings', sa.Column('provider_rating', sa.Float(), nullable=False, server_default='0'))
+    op.add_column('listings', sa.Column('provider_review_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Same copy as app.utils.ratings.reconcile_ratings
+    op.execute("""
+        UPDATE listings SET
+            provider_rating = COALESCE((SELECT average_rating FROM profiles WHERE profiles.user_id = listings.user_id), 0.0),
+            provider_review_count = COALESCE((SELECT rating_count FROM profiles WHERE profiles.user_id = listings.user_id), 0)
+    """)
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_listings_service_id_available_provider_rating', 'listings',
+            ['service_id', 'available', 'provider_rating'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Remove provider ratings from listings."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_listings_service_id_available_provider_rating', table_name='listings',
+            postgresql_concurrently=True, if_exists=True
+        )
+    op.drop_column('listings', 'provider_review_count')
+    op.drop_column('listings', 'provider_rating')
@@ -0,0 +1,38 @@
+"""add listing coordinates
+
+Revision ID: a83f5c2e6d17
+Revises: 7e1d2a9b4f60
+Create Date: 2025-08-17 09:41:53.207614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83f5c2e6d17'
+down_revision: Union[str, Sequence[str], None] = '7e1d2a9b4f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add latitude/longitude and an indexed geohash to listings (fill with scripts.geocode_listings)."""
+    op.add_column('listings', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('listings', sa.Column('longitude', sa.Float(), nullable=True))
+    op.add_column('listings', sa.Column('geohash', sa.String(length=12), nullable=True))
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index('ix_listings_geohash', 'listings', ['geohash'], postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Remove listing coordinates."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_listings_geohash', table_name='listings', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('listings', 'geohash')
+    op.drop_column('listings', 'longitude')
+    op.drop_column('listings', 'latitude')
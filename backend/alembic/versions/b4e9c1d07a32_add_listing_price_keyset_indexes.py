@@ -0,0 +1,39 @@
+"""add listing price keyset indexes
+
+Revision ID: b4e9c1d07a32
+Revises: a83f5c2e6d17
+Create Date: 2025-08-18 11:05:37.204816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e9c1d07a32'
+down_revision: Union[str, Sequence[str], None] = 'a83f5c2e6d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, columns): the (min_price, id) keyset of sort=price, after the
+# equality filters listing search applies (available, optionally service_id)
+INDEXES = [
+    ('ix_listings_available_min_price_id', ['available', 'min_price', 'id']),
+    ('ix_listings_service_id_available_min_price_id', ['service_id', 'available', 'min_price', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Index the price sort so cursor pages seek instead of sorting."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'listings', columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Remove the price keyset indexes."""
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.drop_index(name, table_name='listings', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,51 @@
+"""add foreign key and filter indexes
+
+Revision ID: c0b546b11594
+Revises: 2b7d167cf79b
+Create Date: 2025-08-14 09:42:18.203377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c0b546b11594'
+down_revision: Union[str, Sequence[str], None] = '2b7d167cf79b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) - names match the models' index=True / Index() names
+INDEXES = [
+    ('ix_listings_user_id', 'listings', ['user_id']),
+    ('ix_listings_service_id_available', 'listings', ['service_id', 'available']),
+    ('ix_listings_available_created_at', 'listings', ['available', 'created_at']),
+    ('ix_requests_listing_id', 'requests', ['listing_id']),
+    ('ix_requests_user_id', 'requests', ['user_id']),
+    ('ix_quotes_request_id', 'quotes', ['request_id']),
+    ('ix_quotes_provider_id', 'quotes', ['provider_id']),
+    ('ix_bookings_customer_id', 'bookings', ['customer_id']),
+    ('ix_bookings_provider_id', 'bookings', ['provider_id']),
+    ('ix_bookings_quote_id', 'bookings', ['quote_id']),
+    ('ix_notifications_user_id_is_read_created_at', 'notifications', ['user_id', 'is_read', 'created_at']),
+    ('ix_reviews_reviewee_id', 'reviews', ['reviewee_id']),
+    ('ix_reviews_reviewer_id', 'reviews', ['reviewer_id']),
+    ('ix_reviews_booking_id', 'reviews', ['booking_id']),
+]
+
+
+def upgrade() -> None:
+    """Create indexes online (CREATE INDEX CONCURRENTLY on PostgreSQL)."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Drop the indexes online."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
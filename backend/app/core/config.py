@@ -6,6 +6,57 @@ load_dotenv()
 
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
+    # Optional explicit async URL; when unset it is derived from DATABASE_URL
+    # by swapping in the async driver (asyncpg for PostgreSQL).
+    ASYNC_DATABASE_URI = os.getenv("ASYNC_DATABASE_URL")
+    # Optional read replica for GET requests (and its async counterpart)
+    REPLICA_DATABASE_URI = os.getenv("REPLICA_DATABASE_URL")
+    ASYNC_REPLICA_DATABASE_URI = os.getenv("ASYNC_REPLICA_DATABASE_URL")
+    # After a user's own write, their reads stay on the primary this long
+    READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+    # Connection pool sizing (ignored for SQLite)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    # Per-request SQL statistics (Server-Timing header) and N+1 warnings:
+    # warn once the same statement runs this many times in one request
+    SQL_STATS_ENABLED = os.getenv("SQL_STATS_ENABLED", "true").lower() in ("1", "true", "yes")
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))
+    # Listing search totals: cached per filter set for this many seconds;
+    # above the threshold the planner's row estimate replaces COUNT(*)
+    LISTING_COUNT_CACHE_TTL = float(os.getenv("LISTING_COUNT_CACHE_TTL", "30"))
+    LISTING_COUNT_ESTIMATE_THRESHOLD = int(os.getenv("LISTING_COUNT_ESTIMATE_THRESHOLD", "10000"))
+    # "memory" serves /listings/ from the in-process index (app.utils.listing_index),
+    # resynced from the database every LISTING_INDEX_SYNC_SECONDS
+    LISTING_SEARCH_BACKEND = os.getenv("LISTING_SEARCH_BACKEND", "database")
+    LISTING_INDEX_SYNC_SECONDS = float(os.getenv("LISTING_INDEX_SYNC_SECONDS", "300"))
+    # Search suggestions are rebuilt (with fresh popularity weights) this often
+    SUGGEST_REFRESH_SECONDS = float(os.getenv("SUGGEST_REFRESH_SECONDS", "300"))
+    # How often the similar-listings table picks up listing changes
+    SIMILAR_LISTINGS_REFRESH_SECONDS = float(os.getenv("SIMILAR_LISTINGS_REFRESH_SECONDS", "300"))
+    # Pub/sub backplane fanning WebSocket broadcasts out to every worker:
+    # "memory" (single process), "postgres" (LISTEN/NOTIFY) or "redis".
+    # SOCKET_BACKPLANE_URL defaults to DATABASE_URL / redis://localhost:6379
+    SOCKET_BACKPLANE = os.getenv("SOCKET_BACKPLANE", "memory")
+    SOCKET_BACKPLANE_URL = os.getenv("SOCKET_BACKPLANE_URL")
+    SOCKET_BACKPLANE_CHANNEL = os.getenv("SOCKET_BACKPLANE_CHANNEL", "socket_broadcasts")
+    # Messages queued per WebSocket before the client counts as too slow and is
+    # disconnected, and how long one send may block before the same happens
+    SOCKET_SEND_QUEUE_SIZE = int(os.getenv("SOCKET_SEND_QUEUE_SIZE", "100"))
+    SOCKET_SEND_TIMEOUT_SECONDS = float(os.getenv("SOCKET_SEND_TIMEOUT_SECONDS", "10"))
+    # Sockets that opt in (/ws?heartbeat=true) and are silent for
+    # SOCKET_PING_INTERVAL_SECONDS are pinged, and reaped if they stay silent
+    # for SOCKET_PING_TIMEOUT_SECONDS more
+    SOCKET_PING_INTERVAL_SECONDS = float(os.getenv("SOCKET_PING_INTERVAL_SECONDS", "25"))
+    SOCKET_PING_TIMEOUT_SECONDS = float(os.getenv("SOCKET_PING_TIMEOUT_SECONDS", "20"))
+    # Broadcasts kept per user for replay on reconnect (?last_seq=), for up to
+    # SOCKET_REPLAY_USERS recently connected users per worker (connected users are always kept)
+    SOCKET_REPLAY_BUFFER_SIZE = int(os.getenv("SOCKET_REPLAY_BUFFER_SIZE", "100"))
+    SOCKET_REPLAY_USERS = int(os.getenv("SOCKET_REPLAY_USERS", "10000"))
+    # Local place-name file used to geocode listing locations (see app.utils.geo.Gazetteer)
+    GAZETTEER_PATH = os.getenv("GAZETTEER_PATH")
     JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret")
     ACCESS_TOKEN_EXPIRE_MINUTES = 30
     ALGORITHM = "HS256"
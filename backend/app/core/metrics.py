@@ -0,0 +1,238 @@
+# app/core/metrics.py
+"""
+Minimal in-process Prometheus-style metrics registry.
+
+Values are per worker process; Prometheus aggregates across workers when
+each one is scraped (or the series are summed by instance).
+"""
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Request latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """A gauge that is either set directly or read from a callback at scrape time"""
+    type_name = "gauge"
+
+    def __init__(self, *args, callback: Optional[Callable[[], float]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback = callback
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self) -> List[str]:
+        if self._callback is not None:
+            items = [((), self._callback())]
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> [bucket counts..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._values.items()]
+        lines = self.header()
+        bucket_labels = self.labelnames + ("le",)
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(bucket_labels, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status code",
+    ("method", "route", "status"),
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route"),
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled",
+    ("method",),
+))
+http_request_db_seconds = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request by route template",
+    ("method", "route"),
+))
+http_request_db_queries_total = registry.register(Counter(
+    "http_request_db_queries_total", "SQL statements issued by route template",
+    ("method", "route"),
+))
+notification_broadcasts_total = registry.register(Counter(
+    "notification_broadcasts_total", "WebSocket broadcasts delivered to this worker's user connections, by outcome",
+    ("result",),
+))
+
+websocket_evictions_total = registry.register(Counter(
+    "websocket_evictions_total", "WebSockets disconnected for not keeping up with their messages, by reason",
+    ("reason",),
+))
+
+
+def register_socket_gauges(socket_manager):
+    """Expose live WebSocket counts from the SocketManager at scrape time"""
+    registry.register(Gauge(
+        "websocket_connections", "Open WebSocket connections in this worker",
+        callback=lambda: len(getattr(socket_manager, "active_connections", {})),
+    ))
+    registry.register(Gauge(
+        "websocket_connected_users", "Users with at least one open WebSocket in this worker",
+        callback=lambda: len(getattr(socket_manager, "user_connections", {})),
+    ))
+    registry.register(Gauge(
+        "websocket_send_queue_depth", "Messages waiting in WebSocket send queues in this worker",
+        callback=lambda: socket_manager.queue_stats()["queued"] if hasattr(socket_manager, "queue_stats") else 0,
+    ))
+    registry.register(Gauge(
+        "websocket_send_queue_max_depth", "Longest WebSocket send queue in this worker",
+        callback=lambda: socket_manager.queue_stats()["max_depth"] if hasattr(socket_manager, "queue_stats") else 0,
+    ))
+
+
+def route_template(request) -> str:
+    """Route path template (e.g. /reviews/about/{user_id}) to keep label cardinality bounded"""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+async def metrics_middleware(request, call_next):
+    """Record latency, status, in-flight and DB time per route template"""
+    method = request.method
+    start = time.perf_counter()
+    # The route is only resolved inside call_next, so in-flight is per method
+    http_requests_in_flight.inc(method=method)
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        http_requests_in_flight.dec(method=method)
+        route = route_template(request)
+        http_request_duration_seconds.observe(time.perf_counter() - start, method=method, route=route)
+        http_requests_total.inc(method=method, route=route, status=str(status_code))
+        stats = getattr(request.state, "query_stats", None)
+        if stats is not None:
+            http_request_db_seconds.observe(stats.total_time, method=method, route=route)
+            http_request_db_queries_total.inc(stats.count, method=method, route=route)
@@ -0,0 +1,105 @@
+# app/core/pool.py
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from app.core.config import Config
+
+
+class PoolStats:
+    """
+    Wait-time and timeout counters for one connection pool.
+    Kept outside the pool instance so they survive pool.recreate()/dispose().
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += seconds
+            self.last_wait = seconds
+            if seconds > self.max_wait:
+                self.max_wait = seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.total_wait, 6),
+                "wait_seconds_avg": round(self.total_wait / attempts, 6) if attempts else 0.0,
+                "wait_seconds_max": round(self.max_wait, 6),
+                "wait_seconds_last": round(self.last_wait, 6),
+            }
+
+
+# Registry of stats by engine name ("primary", "async", ...)
+pool_stats: Dict[str, PoolStats] = {}
+
+
+def _timed_pool_class(base, stats: PoolStats):
+    """Subclass a queue pool so every checkout records how long it waited"""
+    class TimedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except exc.TimeoutError:
+                stats.record_wait(time.perf_counter() - start, timed_out=True)
+                raise
+            stats.record_wait(time.perf_counter() - start)
+            return conn
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def get_pool_options(name: str, database_uri: str, is_async: bool = False) -> dict:
+    """
+    Engine keyword arguments for the configured pool.
+    SQLite keeps SQLAlchemy's default pool, so it returns no options.
+    """
+    if database_uri.startswith("sqlite"):
+        return {}
+
+    stats = pool_stats.setdefault(name, PoolStats(name))
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    return {
+        "poolclass": _timed_pool_class(base, stats),
+        "pool_size": Config.DB_POOL_SIZE,
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+        "pool_timeout": Config.DB_POOL_TIMEOUT,
+        "pool_recycle": Config.DB_POOL_RECYCLE,
+        "pool_pre_ping": Config.DB_POOL_PRE_PING,
+    }
+
+
+def describe_pool(name: str, pool) -> dict:
+    """Live gauges for a pool plus the recorded wait statistics"""
+    data = {"name": name, "pool_class": type(pool).__name__}
+    # Only QueuePool variants expose sizing gauges
+    for gauge in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, gauge, None)
+        data[gauge] = fn() if callable(fn) else None
+    data["timeout"] = getattr(pool, "_timeout", None)
+    max_overflow = getattr(pool, "_max_overflow", None)
+    data["max_overflow"] = max_overflow
+    if data["size"] is not None and max_overflow is not None:
+        data["capacity"] = data["size"] + max(max_overflow, 0)
+    stats = pool_stats.get(name)
+    data["waits"] = stats.snapshot() if stats else None
+    return data
@@ -0,0 +1,99 @@
+# app/core/query_stats.py
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """SQL statements issued while handling one request"""
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints: Counter = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.total_time += seconds
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int):
+        """Fingerprints executed at least `threshold` times, most frequent first"""
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n >= threshold]
+
+
+# Stats for the request currently being handled (None outside a request)
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAM = re.compile(r"%\(\w+\)s|:\w+|\$\d+|\?")
+_NUMBER = re.compile(r"\b\d+(\.\d+)?\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalise a statement so the same query with different values matches"""
+    fp = _WHITESPACE.sub(" ", statement).strip()
+    fp = _STRING.sub("?", fp)
+    fp = _PARAM.sub("?", fp)
+    fp = _NUMBER.sub("?", fp)
+    return _PARAM_LIST.sub("(?+)", fp)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_query_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start_time")
+    if starts:
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+
+async def query_stats_middleware(request, call_next):
+    """
+    Count SQL statements and DB time per request, report them in a
+    Server-Timing header and warn when one statement repeats too often (N+1).
+    """
+    if not Config.SQL_STATS_ENABLED:
+        return await call_next(request)
+
+    stats = QueryStats()
+    # Also exposed on request.state for outer middleware (per-route metrics)
+    request.state.query_stats = stats
+    token = current_query_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        current_query_stats.reset(token)
+
+    response.headers.append(
+        "Server-Timing",
+        f'db;dur={stats.total_time * 1000:.1f};desc="{stats.count} queries"'
+    )
+
+    repeated = stats.repeated(Config.SQL_N_PLUS_ONE_THRESHOLD)
+    if repeated:
+        statement, times = repeated[0]
+        logger.warning(
+            f"Possible N+1 on {request.method} {request.url.path}: "
+            f"{stats.count} queries ({stats.total_time * 1000:.1f} ms), "
+            f"statement repeated {times}x: {statement}"
+        )
+    return response
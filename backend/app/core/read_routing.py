@@ -0,0 +1,48 @@
+# app/core/read_routing.py
+import time
+
+from fastapi import Request
+
+from app.core.config import Config
+
+# Methods that never write and may be served from the read replica
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Until when (Unix time) the client's reads stay on the primary. Set as a
+# cookie and a response header after each successful write; clients that do
+# not send cookies (e.g. cross-origin fetches) may echo the header instead.
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+READ_YOUR_WRITES_HEADER = "X-Read-Primary-Until"
+
+
+def _sticky_until(request: Request) -> float:
+    value = request.headers.get(READ_YOUR_WRITES_HEADER) or request.cookies.get(READ_YOUR_WRITES_COOKIE)
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def use_replica(request: Request) -> bool:
+    """
+    Whether this request's session may be bound to the read replica: reads
+    go to the primary while the client's last write may not have replicated.
+    The window travels with the client, so it holds on every worker, and a
+    forged value can only send that client's own reads to the primary.
+    """
+    if request.method not in READ_METHODS:
+        return False
+    return _sticky_until(request) <= time.time()
+
+
+async def read_your_writes_middleware(request: Request, call_next):
+    """Start the read-your-writes window when a write request succeeds"""
+    response = await call_next(request)
+    if request.method not in READ_METHODS and response.status_code < 400 and Config.READ_YOUR_WRITES_SECONDS > 0:
+        until = f"{time.time() + Config.READ_YOUR_WRITES_SECONDS:.3f}"
+        response.headers[READ_YOUR_WRITES_HEADER] = until
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE, until, max_age=max(1, round(Config.READ_YOUR_WRITES_SECONDS)),
+            httponly=True, samesite="lax",
+        )
+    return response
@@ -1,10 +1,57 @@
 # app/database.py
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import Config
+from app.core.pool import get_pool_options
 
-engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+# Async drivers used when ASYNC_DATABASE_URL is not set explicitly
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+def get_async_database_uri(uri: str) -> str:
+    """Derive the async driver URL from the sync DATABASE_URL"""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+engine = create_engine(
+    Config.SQLALCHEMY_DATABASE_URI,
+    **get_pool_options("primary", Config.SQLALCHEMY_DATABASE_URI)
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DATABASE_URI = Config.ASYNC_DATABASE_URI or get_async_database_uri(Config.SQLALCHEMY_DATABASE_URI)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URI,
+    **get_pool_options("async", ASYNC_DATABASE_URI, is_async=True)
+)
+# expire_on_commit=False so ORM objects stay readable after commit without
+# triggering an implicit (and in async, illegal) lazy refresh
+async_session = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Read replica; without REPLICA_DATABASE_URL reads share the primary engines
+if Config.REPLICA_DATABASE_URI:
+    replica_engine = create_engine(
+        Config.REPLICA_DATABASE_URI,
+        **get_pool_options("replica", Config.REPLICA_DATABASE_URI)
+    )
+    ASYNC_REPLICA_DATABASE_URI = Config.ASYNC_REPLICA_DATABASE_URI or get_async_database_uri(Config.REPLICA_DATABASE_URI)
+    async_replica_engine = create_async_engine(
+        ASYNC_REPLICA_DATABASE_URI,
+        **get_pool_options("async_replica", ASYNC_REPLICA_DATABASE_URI, is_async=True)
+    )
+else:
+    replica_engine = engine
+    async_replica_engine = async_engine
+
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+async_replica_session = async_sessionmaker(async_replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
@@ -1,10 +1,21 @@
 # app/dependencies/db.py
-from app.database import SessionLocal
+from fastapi import Request
+from app.database import SessionLocal, ReplicaSessionLocal, async_session, async_replica_session
+from app.core.read_routing import use_replica
 from sqlalchemy.orm import Session
 
-def get_db():
-    db = SessionLocal()
+# GET requests are served from the read replica (when configured) unless the
+# caller wrote recently; see app.core.read_routing for the stickiness rules
+# (read_your_writes_middleware starts the window).
+
+def get_db(request: Request):
+    db = ReplicaSessionLocal() if use_replica(request) else SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db(request: Request):
+    session_factory = async_replica_session if use_replica(request) else async_session
+    async with session_factory() as db:
+        yield db
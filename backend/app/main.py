@@ -1,7 +1,9 @@
 #app/main
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import os
 import logging
 import sys
@@ -23,8 +25,38 @@ from app.routers import auth, profile, category, service, listing, request, book
 from app.routers import admin  # Add this import
 from app.routers import notification  # Import the new notification router
 from app.routers import websocket
+from app.routers import metrics
+from app.routers import search
+from app.core.query_stats import query_stats_middleware
+from app.core.read_routing import READ_YOUR_WRITES_HEADER, read_your_writes_middleware
+from app.core.metrics import metrics_middleware, register_socket_gauges
+from app.sockets.socket_manager import socket_manager
+from app.core.config import Config
+from app.utils.listing_index import keep_listing_index_synced
+from app.utils.suggest import keep_suggestions_fresh
+from app.utils.similar import keep_similar_listings_fresh
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background_tasks = [
+        asyncio.create_task(keep_suggestions_fresh(Config.SUGGEST_REFRESH_SECONDS)),
+        asyncio.create_task(keep_similar_listings_fresh(Config.SIMILAR_LISTINGS_REFRESH_SECONDS)),
+    ]
+    await socket_manager.start()
+    background_tasks.append(asyncio.create_task(
+        socket_manager.keep_alive(Config.SOCKET_PING_INTERVAL_SECONDS, Config.SOCKET_PING_TIMEOUT_SECONDS)
+    ))
+    if Config.LISTING_SEARCH_BACKEND == "memory":
+        # Requests use the database until the first build finishes
+        background_tasks.append(asyncio.create_task(keep_listing_index_synced(Config.LISTING_INDEX_SYNC_SECONDS)))
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await socket_manager.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 origins = [
     "http://localhost:5173",
     "https://localhost:3000",
@@ -35,6 +67,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", READ_YOUR_WRITES_HEADER],
 )
 
 # Serve static files
@@ -55,6 +88,19 @@ app.include_router(user.router)
 app.include_router(admin.router)  # Add this line
 app.include_router(notification.router)  # Add this line
 app.include_router(websocket.router)
+app.include_router(metrics.router)
+app.include_router(search.router)
+
+# Keep a client's reads on the primary for a while after its successful writes
+app.middleware("http")(read_your_writes_middleware)
+
+# Count SQL statements and DB time per request (Server-Timing, N+1 warnings)
+app.middleware("http")(query_stats_middleware)
+
+# Per-route latency/status/DB-time metrics, served at /metrics.
+# Registered after query_stats_middleware so it wraps it and sees its stats.
+app.middleware("http")(metrics_middleware)
+register_socket_gauges(socket_manager)
 
 # Add debug middleware to track WebSocket connections
 @app.middleware("http")
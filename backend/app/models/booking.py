@@ -15,9 +15,9 @@ class Booking(Base, TimestampMixin):
     __tablename__ = "bookings"
 
     id = Column(Integer, primary_key=True, index=True)
-    quote_id = Column(Integer, ForeignKey("quotes.id", ondelete="CASCADE"), nullable=False)
-    customer_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    provider_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    quote_id = Column(Integer, ForeignKey("quotes.id", ondelete="CASCADE"), nullable=False, index=True)
+    customer_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    provider_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     listing_id = Column(Integer, ForeignKey("listings.id", ondelete="CASCADE"), nullable=False)
     scheduled_time = Column(DateTime, nullable=False)
     status = Column(Enum(BookingStatus), default=BookingStatus.scheduled)
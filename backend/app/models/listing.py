@@ -1,13 +1,22 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
 
 class Listing(Base):
     __tablename__ = "listings"
+    __table_args__ = (
+        Index("ix_listings_service_id_available", "service_id", "available"),
+        Index("ix_listings_available_created_at", "available", "created_at"),
+        Index("ix_listings_service_id_available_provider_rating", "service_id", "available", "provider_rating"),
+        Index("ix_listings_geohash", "geohash"),
+        # Keyset pagination for sort=price seeks (min_price, id), with or without a service filter
+        Index("ix_listings_available_min_price_id", "available", "min_price", "id"),
+        Index("ix_listings_service_id_available_min_price_id", "service_id", "available", "min_price", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     service_id = Column(Integer, ForeignKey("services.id", ondelete="CASCADE"), nullable=False)
 
     title = Column(String, nullable=False)
@@ -15,8 +24,16 @@ class Listing(Base):
     min_price = Column(Float)
     max_price = Column(Float)
     location = Column(String)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    # Derived from latitude/longitude on save (app.utils.geo); indexed for radius search
+    geohash = Column(String(12), nullable=True)
     available = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=True)
+    # Copy of the provider's Profile rating so rating filters/sorts need no join
+    # (kept in sync by app.utils.ratings)
+    provider_rating = Column(Float, nullable=False, default=0.0, server_default="0")
+    provider_review_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     user = relationship("User", back_populates="listings")
     service = relationship("Service", back_populates="listings", passive_deletes=True)
@@ -11,6 +11,10 @@ class Profile(Base):
     bio = Column(Text)
     location = Column(String)
     phone = Column(String)
+    # Running totals of received reviews; average_rating = rating_sum / rating_count
+    # (maintained together by app.utils.ratings)
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
     average_rating = Column(Float, default=0.0)
     profile_picture = Column(String, nullable=True)  # New field
 
@@ -7,9 +7,9 @@ class Review(Base, TimestampMixin):
     __tablename__ = "reviews"
 
     id = Column(Integer, primary_key=True, index=True)
-    booking_id = Column(Integer, ForeignKey("bookings.id", ondelete="CASCADE"), unique=False)
-    reviewer_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
-    reviewee_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    booking_id = Column(Integer, ForeignKey("bookings.id", ondelete="CASCADE"), unique=False, index=True)
+    reviewer_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), index=True)
+    reviewee_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), index=True)
     rating = Column(Integer, nullable=False)  # 1–5
     comment = Column(Text, nullable=True)
 
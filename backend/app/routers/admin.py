@@ -12,6 +12,9 @@ from app.schemas.user import UserOut, UserStatusUpdate
 from app.schemas.listing import ListingOut
 from app.schemas.request import RequestOut
 from app.schemas.review import ReviewOut
+from app.utils.ratings import apply_rating_change
+from app.utils.listing_index import listing_index
+from app.utils.suggest import suggestions
 
 def admin_required(current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.admin:
@@ -35,6 +38,7 @@ def delete_user(user_id: int, db: Session = Depends(get_db), _: User = Depends(a
         raise HTTPException(status_code=404, detail="User not found")
     db.delete(user)
     db.commit()
+    listing_index.remove_user_listings(user_id)
     return None
 
 @router.patch("/users/{user_id}/deactivate", response_model=UserOut)
@@ -69,8 +73,34 @@ def delete_listing(listing_id: int, db: Session = Depends(get_db), _: User = Dep
         raise HTTPException(status_code=404, detail="Listing not found")
     db.delete(listing)
     db.commit()
+    listing_index.remove_listing(listing_id)
+    suggestions.remove("listing", listing_id)
     return None
 
+# LISTING SEARCH INDEX (per worker process: each call reaches one worker's index)
+@router.get("/listing-index/check")
+def check_listing_index(db: Session = Depends(get_db), _: User = Depends(admin_required)):
+    """
+    Compare this worker's in-memory listing index with the database without
+    changing it. Other workers keep their own index; see
+    `python -m app.utils.listing_index --check` for an out-of-process check.
+    """
+    documents = listing_index.load_documents(db)
+    differences = listing_index.check(documents)
+    return {
+        "ready": listing_index.ready,
+        "synced_at": listing_index.synced_at,
+        "indexed": len(listing_index),
+        "listings": len(documents),
+        "consistent": not any(differences.values()),
+        **differences,
+    }
+
+@router.post("/listing-index/rebuild")
+def rebuild_listing_index(db: Session = Depends(get_db), _: User = Depends(admin_required)):
+    """Rebuild this worker's in-memory listing index from the database"""
+    return {"indexed": listing_index.rebuild(db)}
+
 # REQUESTS
 @router.get("/requests", response_model=List[RequestOut])
 def get_all_requests(db: Session = Depends(get_db), _: User = Depends(admin_required)):
@@ -95,6 +125,10 @@ def delete_review(review_id: int, db: Session = Depends(get_db), _: User = Depen
     review = db.query(Review).filter(Review.id == review_id).first()
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
+    reviewee_id = review.reviewee_id
+    apply_rating_change(db, reviewee_id, -1, -review.rating)
     db.delete(review)
     db.commit()
+    if reviewee_id is not None:
+        listing_index.refresh_user_listings(db, reviewee_id)
     return None
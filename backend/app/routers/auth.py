@@ -9,6 +9,7 @@ from app.models.user import User
 from app.core.security import hash_password, verify_password
 from app.utils.auth import create_access_token, get_current_user
 from app.dependencies.db import get_db
+from app.utils.listing_index import listing_index
 
 router = APIRouter()
 
@@ -41,6 +42,8 @@ def get_me(current_user: User = Depends(get_current_user)):
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 def delete_me(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    user_id = current_user.id
     db.delete(current_user)
     db.commit()
+    listing_index.remove_user_listings(user_id)
     return None
\ No newline at end of file
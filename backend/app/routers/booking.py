@@ -9,12 +9,13 @@ from app.models.quote import Quote
 from app.models.request import Request
 from app.models.user import User
 from app.models.review import Review
-from app.models.profile import Profile
 from app.models.listing import Listing
 from app.schemas.booking import BookingCreate, BookingOut, BookingUpdate
 from app.utils.auth import get_current_user
 from app.dependencies.db import get_db
 from app.routers.notification import create_notification_sync  # Change to sync version
+from app.utils.ratings import apply_rating_change
+from app.utils.listing_index import listing_index
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -164,18 +165,10 @@ def create_review_for_booking(
         comment=data.get("comment", "")
     )
     db.add(review)
+    # Update the reviewee's rating totals (customer or provider) in the same transaction
+    apply_rating_change(db, reviewee_id, 1, data["rating"])
     db.commit()
-
-    # After review, update average_rating for customer if reviewee is customer
-    if reviewer_role == "provider":
-        customer_profile = db.query(Profile).filter(Profile.user_id == reviewee_id).first()
-        if customer_profile:
-            # Calculate new average rating for customer
-            customer_reviews = db.query(Review).filter_by(reviewee_id=reviewee_id).all()
-            if customer_reviews:
-                avg = sum(r.rating for r in customer_reviews) / len(customer_reviews)
-                customer_profile.average_rating = avg
-                db.commit()
+    listing_index.refresh_user_listings(db, reviewee_id)
     
     # Send notification to the reviewee
     try:
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryOut
 from app.dependencies.db import get_db
+from app.utils.suggest import suggestions
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
@@ -14,6 +15,7 @@ def create_category(data: CategoryCreate, db: Session = Depends(get_db)):
     db.add(category)
     db.commit()
     db.refresh(category)
+    suggestions.upsert("category", category.id, category.name)
     return category
 
 @router.get("/", response_model=list[CategoryOut])
@@ -36,6 +38,7 @@ def update_category(category_id: int, data: CategoryUpdate, db: Session = Depend
     category.description = data.description
     db.commit()
     db.refresh(category)
+    suggestions.upsert("category", category.id, category.name)
     return category
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -45,4 +48,6 @@ def delete_category(category_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Category not found")
     db.delete(category)
     db.commit()
+    # Deleting a category cascades to its services and listings: reload everything
+    suggestions.refresh(db)
     return None
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
 
-from app.dependencies.db import get_db
+from app.dependencies.db import get_async_db
 from app.utils.auth import get_current_user
 from app.models.user import User
+from app.models.profile import Profile
 from app.models.request import Request, RequestStatus
 from app.models.quote import Quote
 from app.models.booking import Booking, BookingStatus
@@ -28,8 +30,12 @@ def format_duration(seconds: int) -> str:
 
 # Get provider dashboard data
 @router.get("/provider", response_model=ProviderDashboard)
-async def get_provider_dashboard(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """Get dashboard data for a service provider"""
+async def get_provider_dashboard(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    """
+    Get dashboard data for a service provider.
+    Runs a fixed number of queries (counts are SQL aggregates, names and titles
+    come from joins) so the cost does not grow with the provider's history.
+    """
     
     # Check if user is a provider
     if current_user.role != "provider":
@@ -38,66 +44,105 @@ async def get_provider_dashboard(db: Session = Depends(get_db), current_user: Us
             detail="Only providers can access this dashboard"
         )
     
-    # Get provider's listings
-    listings = db.query(Listing).filter(Listing.user_id == current_user.id).all()
-    listing_ids = [listing.id for listing in listings]
-    
-    # Get all requests for provider's listings
-    requests = []
-    if listing_ids:
-        requests = db.query(Request).filter(Request.listing_id.in_(listing_ids)).all()
-    
-    # Get quotes sent by the provider
-    quotes = db.query(Quote).filter(Quote.provider_id == current_user.id).all()
-    
-    # Get bookings where provider is involved
-    bookings = db.query(Booking).filter(Booking.provider_id == current_user.id).all()
-    
-    # Calculate response rate (quotes / requests)
-    total_requests = len(requests)
-    total_responded = len([r for r in requests if r.status != RequestStatus.open])
+    # Get provider's listings with their request counts
+    request_counts = (
+        select(Request.listing_id, func.count(Request.id).label("request_count"))
+        .join(Listing, Request.listing_id == Listing.id)
+        .filter(Listing.user_id == current_user.id)
+        .group_by(Request.listing_id)
+        .subquery()
+    )
+    listing_rows = (await db.execute(
+        select(Listing, func.coalesce(request_counts.c.request_count, 0))
+        .outerjoin(request_counts, request_counts.c.listing_id == Listing.id)
+        .filter(Listing.user_id == current_user.id)
+        .order_by(Listing.id)
+    )).all()
+    
+    # Request totals for the response rate
+    total_requests, total_responded = (await db.execute(
+        select(
+            func.count(Request.id),
+            func.count(Request.id).filter(Request.status != RequestStatus.open)
+        )
+        .join(Listing, Request.listing_id == Listing.id)
+        .filter(Listing.user_id == current_user.id)
+    )).one()
     response_rate = (total_responded / total_requests * 100) if total_requests > 0 else 0
     
+    # Get all requests for provider's listings with listing title and customer name
+    request_rows = (await db.execute(
+        select(Request, Listing.title, Profile.full_name)
+        .join(Listing, Request.listing_id == Listing.id)
+        .outerjoin(Profile, Profile.user_id == Request.user_id)
+        .filter(Listing.user_id == current_user.id)
+        .order_by(Request.id)
+    )).all()
+    
+    # Get quotes sent by the provider with the requested listing and customer name
+    quote_rows = (await db.execute(
+        select(Quote, Listing.title, Profile.full_name)
+        .join(Request, Quote.request_id == Request.id)
+        .join(Listing, Request.listing_id == Listing.id)
+        .outerjoin(Profile, Profile.user_id == Request.user_id)
+        .filter(Quote.provider_id == current_user.id)
+        .order_by(Quote.id)
+    )).all()
+    
+    # Get bookings where provider is involved, with quote price, listing and customer name
+    booking_rows = (await db.execute(
+        select(Booking, Quote.price, Listing.title, Profile.full_name)
+        .outerjoin(Quote, Booking.quote_id == Quote.id)
+        .outerjoin(Request, Quote.request_id == Request.id)
+        .outerjoin(Listing, Request.listing_id == Listing.id)
+        .outerjoin(Profile, Profile.user_id == Booking.customer_id)
+        .filter(Booking.provider_id == current_user.id)
+        .order_by(Booking.id)
+    )).all()
+    
     # Calculate average response time (mock data for now)
     # In a real implementation, you'd compare quote.created_at with request.created_at
     avg_response_time = "4 hours"  # Placeholder
     
-    # Calculate client stats
-    unique_customers = set()
-    repeat_customers = set()
-    
-    for booking in bookings:
-        customer_id = booking.customer_id
-        if customer_id in unique_customers:
-            repeat_customers.add(customer_id)
-        else:
-            unique_customers.add(customer_id)
-    
-    new_clients = len(unique_customers) - len(repeat_customers)
-    returning_clients = len(repeat_customers)
+    # Calculate client stats: customers with one booking are new, more than one returning
+    bookings_per_customer = (
+        select(Booking.customer_id, func.count(Booking.id).label("booking_count"))
+        .filter(Booking.provider_id == current_user.id)
+        .group_by(Booking.customer_id)
+        .subquery()
+    )
+    unique_customers, returning_clients = (await db.execute(
+        select(
+            func.count(),
+            func.count().filter(bookings_per_customer.c.booking_count > 1)
+        ).select_from(bookings_per_customer)
+    )).one()
+    new_clients = unique_customers - returning_clients
     
     # Get revenue from completed bookings (placeholder)
     # In a real implementation, you'd sum from payments table
-    total_revenue = sum([100 for b in bookings if b.status == BookingStatus.completed])
+    total_revenue = sum([100 for booking, *_ in booking_rows if booking.status == BookingStatus.completed])
     
     # Get average rating from reviews
-    reviews = db.query(Review).filter(Review.reviewee_id == current_user.id).all()
-    avg_rating = sum([r.rating for r in reviews]) / len(reviews) if reviews else None
+    avg_rating = (await db.execute(
+        select(func.avg(Review.rating)).filter(Review.reviewee_id == current_user.id)
+    )).scalar()
+    avg_rating = float(avg_rating) if avg_rating is not None else None
     
     # Generate recent activity
     recent_activities = []
     
     # Add recent requests
-    for i, req in enumerate(sorted(requests, key=lambda x: x.created_at, reverse=True)[:3]):
+    for i, (req, listing_title, _) in enumerate(sorted(request_rows, key=lambda row: row[0].created_at, reverse=True)[:3]):
         recent_activities.append({
             "id": i + 1,
             "type": "request",
-            "message": f"New request received for listing '{req.listing.title}'",
+            "message": f"New request received for listing '{listing_title}'",
             "timestamp": req.created_at
         })
     
     # Add recent quotes
-    for i, quote in enumerate(sorted(quotes, key=lambda x: x.created_at, reverse=True)[:3]):
+    for i, (quote, *_) in enumerate(sorted(quote_rows, key=lambda row: row[0].created_at, reverse=True)[:3]):
         recent_activities.append({
             "id": len(recent_activities) + i + 1,
             "type": "quote",
@@ -106,7 +151,7 @@ async def get_provider_dashboard(db: Session = Depends(get_db), current_user: Us
         })
     
     # Add recent bookings
-    for i, booking in enumerate(sorted(bookings, key=lambda x: x.created_at, reverse=True)[:3]):
+    for i, (booking, *_) in enumerate(sorted(booking_rows, key=lambda row: row[0].created_at, reverse=True)[:3]):
         recent_activities.append({
             "id": len(recent_activities) + i + 1,
             "type": "booking",
@@ -119,8 +164,7 @@ async def get_provider_dashboard(db: Session = Depends(get_db), current_user: Us
     
     # Format listings for response
     formatted_listings = []
-    for listing in listings:
-        request_count = len([r for r in requests if r.listing_id == listing.id])
+    for listing, request_count in listing_rows:
         formatted_listings.append({
             "id": listing.id,
             "title": listing.title,
@@ -136,30 +180,23 @@ async def get_provider_dashboard(db: Session = Depends(get_db), current_user: Us
     
     # Format requests for response
     formatted_requests = []
-    for req in requests:
-        # Get customer name from the request's user
-        customer_name = db.query(User).filter(User.id == req.user_id).first().profile.full_name if db.query(User).filter(User.id == req.user_id).first().profile else "Unknown Customer"
-        
+    for req, listing_title, customer_name in request_rows:
         formatted_requests.append({
             "id": req.id,
             "listing_id": req.listing_id,
-            "listing_title": req.listing.title,
+            "listing_title": listing_title,
             "description": req.description,
             "preferred_date": req.preferred_date,
             "status": req.status,
             "created_at": req.created_at,
             "customer_id": req.user_id,  # Include the customer_id
-            "customer_name": customer_name,
+            "customer_name": customer_name or "Unknown Customer",
             "location": req.location
         })
     
     # Format quotes for response
     formatted_quotes = []
-    for quote in quotes:
-        # Get request and customer name
-        request_obj = db.query(Request).filter(Request.id == quote.request_id).first()
-        customer_name = db.query(User).filter(User.id == request_obj.user_id).first().profile.full_name if db.query(User).filter(User.id == request_obj.user_id).first().profile else "Unknown Customer"
-        
+    for quote, listing_title, customer_name in quote_rows:
         formatted_quotes.append({
             "id": quote.id,
             "request_id": quote.request_id,
@@ -168,29 +205,22 @@ async def get_provider_dashboard(db: Session = Depends(get_db), current_user: Us
             "expiry_date": datetime.now() + timedelta(days=7),  # Placeholder
             "status": quote.status,
             "created_at": quote.created_at,
-            "customer_name": customer_name,
-            "service_title": request_obj.listing.title
+            "customer_name": customer_name or "Unknown Customer",
+            "service_title": listing_title
         })
     
     # Format bookings for response
     formatted_bookings = []
-    for booking in bookings:
-        # Get customer name
-        customer_name = db.query(User).filter(User.id == booking.customer_id).first().profile.full_name if db.query(User).filter(User.id == booking.customer_id).first().profile else "Unknown Customer"
-        
-        # Get quote and associated listing/request
-        quote = db.query(Quote).filter(Quote.id == booking.quote_id).first()
-        listing_title = quote.request.listing.title if quote and quote.request and quote.request.listing else "Unknown Service"
-        
+    for booking, price, listing_title, customer_name in booking_rows:
         formatted_bookings.append({
             "id": booking.id,
             "quote_id": booking.quote_id,
             "scheduled_time": booking.scheduled_time,
             "status": booking.status,
             "created_at": booking.created_at,
-            "customer_name": customer_name,
-            "service_title": listing_title,
-            "price": quote.price if quote else 0,
+            "customer_name": customer_name or "Unknown Customer",
+            "service_title": listing_title or "Unknown Service",
+            "price": price if price is not None else 0,
             "has_review": booking.has_review  # Add this line to include has_review field
         })
     
@@ -198,9 +228,9 @@ async def get_provider_dashboard(db: Session = Depends(get_db), current_user: Us
     dashboard_data = {
         "stats": {
             "totalRequests": total_requests,
-            "totalQuotes": len(quotes),
-            "totalBookings": len(bookings),
-            "totalListings": len(listings),
+            "totalQuotes": len(quote_rows),
+            "totalBookings": len(booking_rows),
+            "totalListings": len(listing_rows),
             "totalRevenue": total_revenue,
             "averageRating": avg_rating
         },
@@ -221,8 +251,11 @@ async def get_provider_dashboard(db: Session = Depends(get_db), current_user: Us
 
 # Get customer dashboard data
 @router.get("/customer", response_model=CustomerDashboard)
-async def get_customer_dashboard(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """Get dashboard data for a customer"""
+async def get_customer_dashboard(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    """
+    Get dashboard data for a customer.
+    Like the provider dashboard, runs a fixed number of queries.
+    """
     
     # Check if user is a customer
     if current_user.role != "customer":
@@ -231,41 +264,62 @@ async def get_customer_dashboard(db: Session = Depends(get_db), current_user: Us
             detail="Only customers can access this dashboard"
         )
     
-    # Get customer's requests
-    requests = db.query(Request).filter(Request.user_id == current_user.id).all()
-    request_ids = [req.id for req in requests]
-    
-    # Get quotes received for these requests
-    quotes = []
-    if request_ids:
-        quotes = db.query(Quote).filter(Quote.request_id.in_(request_ids)).all()
-    
-    # Get bookings where customer is involved
-    bookings = db.query(Booking).filter(Booking.customer_id == current_user.id).all()
-    
-    # Get reviews left by this customer
-    reviews = db.query(Review).filter(Review.reviewer_id == current_user.id).all()
-    
-    # Calculate request stats
-    pending_requests = len([r for r in requests if r.status == RequestStatus.open])
-    quoted_requests = len([r for r in requests if r.status == RequestStatus.quoted])
-    booked_requests = len([r for r in requests if r.status == RequestStatus.booked])
-    completed_requests = len([r for r in requests if r.status == RequestStatus.closed])
+    # Calculate request stats in one grouped query
+    status_counts = dict((await db.execute(
+        select(Request.status, func.count(Request.id))
+        .filter(Request.user_id == current_user.id)
+        .group_by(Request.status)
+    )).all())
+    total_requests = sum(status_counts.values())
+    pending_requests = status_counts.get(RequestStatus.open, 0)
+    quoted_requests = status_counts.get(RequestStatus.quoted, 0)
+    booked_requests = status_counts.get(RequestStatus.booked, 0)
+    completed_requests = status_counts.get(RequestStatus.closed, 0)
+    
+    # Get customer's requests with listing title and provider name
+    request_rows = (await db.execute(
+        select(Request, Listing.title, Profile.full_name)
+        .join(Listing, Request.listing_id == Listing.id)
+        .outerjoin(Profile, Profile.user_id == Listing.user_id)
+        .filter(Request.user_id == current_user.id)
+        .order_by(Request.id)
+    )).all()
+    
+    # Get quotes received for these requests with listing title and provider name
+    quote_rows = (await db.execute(
+        select(Quote, Listing.title, Profile.full_name)
+        .join(Request, Quote.request_id == Request.id)
+        .outerjoin(Listing, Request.listing_id == Listing.id)
+        .outerjoin(Profile, Profile.user_id == Quote.provider_id)
+        .filter(Request.user_id == current_user.id)
+        .order_by(Quote.id)
+    )).all()
+    
+    # Get bookings where customer is involved, with quote price, listing and provider name
+    booking_rows = (await db.execute(
+        select(Booking, Quote.price, Listing.title, Profile.full_name)
+        .outerjoin(Quote, Booking.quote_id == Quote.id)
+        .outerjoin(Request, Quote.request_id == Request.id)
+        .outerjoin(Listing, Request.listing_id == Listing.id)
+        .outerjoin(Profile, Profile.user_id == Booking.provider_id)
+        .filter(Booking.customer_id == current_user.id)
+        .order_by(Booking.id)
+    )).all()
     
     # Generate recent activity
     recent_activities = []
     
     # Add recent requests
-    for i, req in enumerate(sorted(requests, key=lambda x: x.created_at, reverse=True)[:3]):
+    for i, (req, listing_title, _) in enumerate(sorted(request_rows, key=lambda row: row[0].created_at, reverse=True)[:3]):
         recent_activities.append({
             "id": i + 1,
             "type": "request",
-            "message": f"You requested '{req.listing.title}'",
+            "message": f"You requested '{listing_title}'",
             "timestamp": req.created_at
         })
     
     # Add recent quotes
-    for i, quote in enumerate(sorted(quotes, key=lambda x: x.created_at, reverse=True)[:3]):
+    for i, (quote, *_) in enumerate(sorted(quote_rows, key=lambda row: row[0].created_at, reverse=True)[:3]):
         recent_activities.append({
             "id": len(recent_activities) + i + 1,
             "type": "quote",
@@ -274,7 +328,7 @@ async def get_customer_dashboard(db: Session = Depends(get_db), current_user: Us
         })
     
     # Add recent bookings
-    for i, booking in enumerate(sorted(bookings, key=lambda x: x.created_at, reverse=True)[:3]):
+    for i, (booking, *_) in enumerate(sorted(booking_rows, key=lambda row: row[0].created_at, reverse=True)[:3]):
         recent_activities.append({
             "id": len(recent_activities) + i + 1,
             "type": "booking",
@@ -287,32 +341,21 @@ async def get_customer_dashboard(db: Session = Depends(get_db), current_user: Us
     
     # Format requests for response
     formatted_requests = []
-    for req in requests:
-        # Get provider name from the listing's user
-        provider_name = req.listing.user.profile.full_name if req.listing.user.profile else "Unknown Provider"
-        
+    for req, listing_title, provider_name in request_rows:
         formatted_requests.append({
             "id": req.id,
             "listing_id": req.listing_id,
-            "listing_title": req.listing.title,
+            "listing_title": listing_title,
             "description": req.description,
             "preferred_date": req.preferred_date,
             "status": req.status,
             "created_at": req.created_at,
-            "provider_name": provider_name
+            "provider_name": provider_name or "Unknown Provider"
         })
     
     # Format quotes for response
     formatted_quotes = []
-    for quote in quotes:
-        # Get provider name
-        provider = db.query(User).filter(User.id == quote.provider_id).first()
-        provider_name = provider.profile.full_name if provider and provider.profile else "Unknown Provider"
-        
-        # Get request and associated listing
-        request_obj = db.query(Request).filter(Request.id == quote.request_id).first()
-        service_title = request_obj.listing.title if request_obj and request_obj.listing else "Unknown Service"
-        
+    for quote, listing_title, provider_name in quote_rows:
         formatted_quotes.append({
             "id": quote.id,
             "request_id": quote.request_id,
@@ -321,39 +364,31 @@ async def get_customer_dashboard(db: Session = Depends(get_db), current_user: Us
             "expiry_date": datetime.now() + timedelta(days=7),  # Placeholder
             "status": quote.status,
             "created_at": quote.created_at,
-            "provider_name": provider_name,
-            "service_title": service_title
+            "provider_name": provider_name or "Unknown Provider",
+            "service_title": listing_title or "Unknown Service"
         })
     
     # Format bookings for response
     formatted_bookings = []
-    for booking in bookings:
-        # Get provider name
-        provider = db.query(User).filter(User.id == booking.provider_id).first()
-        provider_name = provider.profile.full_name if provider and provider.profile else "Unknown Provider"
-        
-        # Get quote and associated service info
-        quote = db.query(Quote).filter(Quote.id == booking.quote_id).first()
-        service_title = quote.request.listing.title if quote and quote.request and quote.request.listing else "Unknown Service"
-        
+    for booking, price, listing_title, provider_name in booking_rows:
         formatted_bookings.append({
             "id": booking.id,
             "quote_id": booking.quote_id,
             "scheduled_time": booking.scheduled_time,
             "status": booking.status,
             "created_at": booking.created_at,
-            "provider_name": provider_name,
-            "service_title": service_title,
-            "price": quote.price if quote else 0,
+            "provider_name": provider_name or "Unknown Provider",
+            "service_title": listing_title or "Unknown Service",
+            "price": price if price is not None else 0,
             "has_review": booking.has_review  # Add this line to include has_review field
         })
     
     # Compile dashboard data
     dashboard_data = {
         "stats": {
-            "totalRequests": len(requests),
-            "totalQuotes": len(quotes),
-            "totalBookings": len(bookings),
+            "totalRequests": total_requests,
+            "totalQuotes": len(quote_rows),
+            "totalBookings": len(booking_rows),
             "averageRating": None  # Customers don't have ratings
         },
         "requestStats": {
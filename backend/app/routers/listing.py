@@ -1,15 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime  # Add this import
 
 from app.dependencies.db import get_db
 from app.models.listing import Listing
-from app.schemas.listing import ListingCreate, ListingOut, ListingOutWithProfile, PaginatedListingResponse
+from app.schemas.listing import ListingCreate, ListingOut, ListingOutWithProfile, PaginatedListingResponse, FacetedListingResponse, ListingBatchResponse, SimilarListingOut, ListingSearchItem
 from app.utils.auth import get_current_user
 from app.models.user import User
 from app.models.service import Service  # Import the Service model
 from app.models.profile import Profile  # Make sure to import this
+from app.utils.search import apply_keyword_search
+from app.utils.geo import apply_radius_search, geocode_listing, haversine_km, parse_point
+from app.utils.facets import listing_facets, parse_facets
+from app.utils.listing_counts import count_listings
+from app.utils.listing_index import listing_index
+from app.utils.suggest import suggestions
+from app.utils.similar import similar_listings
+from app.core.config import Config
+from app.utils.pagination import LISTING_SORT_PATTERN, order_listings, paginate_listings_by_cursor
 
 router = APIRouter(prefix="/listings", tags=["Listings"])
 
@@ -23,8 +32,9 @@ def get_my_listings(
     print(f"Found {len(listings)} listings for current user {current_user.id}")
     return listings
 
-@router.get("/", response_model=List[ListingOut])
+@router.get("/", response_model=Union[List[ListingSearchItem], FacetedListingResponse])
 def get_listings(
+    response: Response,
     keyword: Optional[str] = Query(None),
     min_price: Optional[float] = Query(None),
     max_price: Optional[float] = Query(None),
@@ -33,17 +43,42 @@ def get_listings(
     min_rating: Optional[float] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    sort: Optional[str] = Query(None, pattern=LISTING_SORT_PATTERN),
+    cursor: Optional[str] = Query(None, description="Keyset cursor; pass an empty value for the first page"),
+    facets: Optional[str] = Query(None, description="Comma-separated facets (service, price, location) or 'all'"),
+    near: Optional[str] = Query(None, description="'lat,lon': only listings within radius_km, nearest first"),
+    radius_km: float = Query(10, gt=0, le=500),
     db: Session = Depends(get_db)
 ):
+    # With facets, the response becomes {"items": [...], "facets": {...}}
+    facet_names = parse_facets(facets) if facets else []
+    point = None
+    if near:
+        try:
+            point = parse_point(near)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid near: {e}")
+        if cursor is not None or sort:
+            raise HTTPException(status_code=400, detail="near results are sorted by distance; sort and cursor do not apply")
+
+    # Serve plain searches from the in-memory index when it is enabled and built
+    if Config.LISTING_SEARCH_BACKEND == "memory" and listing_index.ready and not (cursor is not None or point or facet_names):
+        items, _ = listing_index.search(
+            keyword=keyword, service_id=service_id, location=location, min_price=min_price,
+            max_price=max_price, min_rating=min_rating, sort=sort, page=page, limit=limit,
+        )
+        response.headers["X-Search-Backend"] = "memory"
+        return items
+
     # Start with base query - ensure we select all needed fields
     # Add joinedload to fetch user profiles with listings
     query = db.query(Listing).options(
         joinedload(Listing.user).joinedload(User.profile)
     ).filter(Listing.available == True)
     
-    # Apply filters
+    # Apply filters (relevance order only when no explicit sort or distance order applies)
     if keyword:
-        query = query.filter(Listing.title.ilike(f"%{keyword}%") | Listing.description.ilike(f"%{keyword}%"))
+        query = apply_keyword_search(query, db, keyword, order=sort is None and cursor is None and point is None)
     if service_id:
         query = query.filter(Listing.service_id == service_id)
     if location:
@@ -52,13 +87,24 @@ def get_listings(
         query = query.filter(Listing.min_price >= min_price)
     if max_price is not None:
         query = query.filter(Listing.max_price <= max_price)
+    if min_rating is not None:
+        query = query.filter(Listing.provider_rating >= min_rating)
+
+    if point:
+        query = apply_radius_search(query, point[0], point[1], radius_km)
+
+    # Facet counts cover the whole filtered set, in one grouped query
+    facet_counts = listing_facets(query, db, facet_names) if facet_names else None
     
-    # Add pagination
-    total = query.count()
-    query = query.offset((page - 1) * limit).limit(limit)
-    
-    # Get results
-    results = query.all()
+    # Add pagination: keyset when a cursor is given, offset otherwise
+    if cursor is not None:
+        results, next_cursor = paginate_listings_by_cursor(query, sort or "newest", cursor, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    else:
+        if sort:
+            query = order_listings(query, sort)
+        results = query.offset((page - 1) * limit).limit(limit).all()
     
     # Prepare the response items with profile information
     response_items = []
@@ -74,8 +120,14 @@ def get_listings(
             "available": listing.available,
             "user_id": listing.user_id,
             "service_id": listing.service_id,
-            "created_at": listing.created_at
+            "created_at": listing.created_at,
+            "provider_rating": listing.provider_rating,
+            "provider_review_count": listing.provider_review_count,
+            "latitude": listing.latitude,
+            "longitude": listing.longitude
         }
+        if point:
+            listing_dict["distance_km"] = round(haversine_km(point[0], point[1], listing.latitude, listing.longitude), 3)
         
         # Add profile information if available
         if listing.user and listing.user.profile:
@@ -93,9 +145,52 @@ def get_listings(
         
         response_items.append(listing_dict)
     
+    if facet_counts is not None:
+        return {"items": response_items, "facets": facet_counts}
     return response_items
 
 
+# Upper bound on ids per /listings/batch call
+MAX_BATCH_IDS = 100
+
+# Declared before /{listing_id} so "batch" is not parsed as an id
+@router.get("/batch", response_model=ListingBatchResponse)
+def get_listings_batch(
+    ids: str = Query(..., description="Comma-separated listing ids, e.g. 1,2,3"),
+    db: Session = Depends(get_db)
+):
+    """Get several listings with their provider profiles in one query, in the order requested"""
+    try:
+        # Drop duplicates but keep the first-seen order
+        listing_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if not listing_ids:
+        raise HTTPException(status_code=400, detail="No listing ids given")
+    if len(listing_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+
+    listings = db.query(Listing).options(
+        joinedload(Listing.user).joinedload(User.profile)
+    ).filter(Listing.id.in_(listing_ids)).all()
+    by_id = {listing.id: listing for listing in listings}
+
+    items = []
+    for listing_id in listing_ids:
+        listing = by_id.get(listing_id)
+        if listing is None:
+            continue
+        item = ListingOut.from_orm(listing).dict()
+        profile = listing.user.profile if listing.user else None
+        item["profile"] = profile
+        items.append(item)
+
+    return {
+        "items": items,
+        "missing": [listing_id for listing_id in listing_ids if listing_id not in by_id],
+    }
+
+
 @router.get("/{listing_id}", response_model=ListingOut)
 def get_listing(listing_id: int, db: Session = Depends(get_db)):
     # Use joinedload to load the profile along with the listing
@@ -123,6 +218,30 @@ def get_listing(listing_id: int, db: Session = Depends(get_db)):
     return result
 
 
+@router.get("/{listing_id}/similar", response_model=List[SimilarListingOut])
+def get_similar_listings(
+    listing_id: int,
+    limit: int = Query(6, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """Most similar available listings, from the precomputed neighbour table"""
+    neighbours = similar_listings.neighbours(listing_id)
+    if neighbours is None:
+        # Not in the table yet (new, unavailable, or table still building)
+        if not db.query(Listing.id).filter(Listing.id == listing_id).first():
+            raise HTTPException(status_code=404, detail="Listing not found")
+        return []
+
+    similarity = dict(neighbours[:limit])
+    listings = db.query(Listing).filter(Listing.id.in_(list(similarity)), Listing.available == True).all()
+    results = []
+    for listing in sorted(listings, key=lambda l: -similarity[l.id]):
+        item = ListingOut.from_orm(listing).dict()
+        item["similarity"] = round(similarity[listing.id], 4)
+        results.append(item)
+    return results
+
+
 @router.post("/", response_model=ListingOut)
 def create_listing(
     listing_data: ListingCreate,
@@ -132,10 +251,22 @@ def create_listing(
     if current_user.role != "provider":
         raise HTTPException(status_code=403, detail="Only providers can create listings.")
     
-    new_listing = Listing(**listing_data.dict(), user_id=current_user.id)
+    # Start from the provider's current rating; app.utils.ratings keeps it in sync
+    profile = current_user.profile
+    new_listing = Listing(
+        **listing_data.dict(),
+        user_id=current_user.id,
+        provider_rating=(profile.average_rating or 0.0) if profile else 0.0,
+        provider_review_count=profile.rating_count if profile else 0,
+    )
+    # Coordinates not sent: look the location up in the local gazetteer
+    geocode_listing(new_listing)
     db.add(new_listing)
     db.commit()
     db.refresh(new_listing)
+    listing_index.upsert_listing(new_listing)
+    if new_listing.available:
+        suggestions.upsert("listing", new_listing.id, new_listing.title)
     return new_listing
 
 @router.put("/{listing_id}", response_model=ListingOut)
@@ -156,10 +287,20 @@ def update_listing(
     if not service:
         raise HTTPException(status_code=400, detail="Invalid service_id")
 
-    for field, value in updated_data.dict().items():
+    data = updated_data.dict()
+    if (data["latitude"] is None or data["longitude"] is None) and data["location"] == listing.location:
+        # Coordinates not sent and the place is unchanged: keep the stored ones
+        del data["latitude"], data["longitude"]
+    for field, value in data.items():
         setattr(listing, field, value)
+    geocode_listing(listing)
     db.commit()
     db.refresh(listing)
+    listing_index.upsert_listing(listing, service.name)
+    if listing.available:
+        suggestions.upsert("listing", listing.id, listing.title)
+    else:
+        suggestions.remove("listing", listing.id)
     return listing
 
 
@@ -177,6 +318,8 @@ def delete_listing(
 
     db.delete(listing)
     db.commit()
+    listing_index.remove_listing(listing_id)
+    suggestions.remove("listing", listing_id)
     return {"detail": "Listing deleted successfully"}
 
 @router.get("/user/{user_id}", response_model=List[ListingOut])
@@ -201,6 +344,7 @@ def get_listings_by_user_id(
 
 @router.get("/service/{service_id}", response_model=PaginatedListingResponse)
 def get_listings_by_service_id(
+    response: Response,
     service_id: int,
     page: int = Query(1, ge=1),
     limit: int = Query(9, ge=1, le=100),
@@ -209,9 +353,17 @@ def get_listings_by_service_id(
     max_price: Optional[float] = Query(None),
     location: Optional[str] = Query(None),
     min_rating: Optional[float] = Query(None),
+    sort: Optional[str] = Query(None, pattern=LISTING_SORT_PATTERN),
+    cursor: Optional[str] = Query(None, description="Keyset cursor; pass an empty value for the first page"),
     db: Session = Depends(get_db)
 ):
-    """Get listings for a specific service by its ID with pagination and filtering"""
+    """
+    Get listings for a specific service by its ID with pagination and filtering.
+
+    Passing `cursor` switches to keyset pagination: the response carries
+    `next_cursor` (also sent as the X-Next-Cursor header) and skips the
+    total count.
+    """
     # First check if the service exists
     service = db.query(Service).filter(Service.id == service_id).first()
     if not service:
@@ -225,24 +377,39 @@ def get_listings_by_service_id(
         Listing.available == True
     )
     
-    # Apply filters if provided
+    # Apply filters if provided (relevance order only when no explicit sort applies)
     if keyword:
-        query = query.filter(Listing.title.ilike(f"%{keyword}%") | Listing.description.ilike(f"%{keyword}%"))
+        query = apply_keyword_search(query, db, keyword, order=sort is None and cursor is None)
     if min_price is not None:
         query = query.filter(Listing.min_price >= min_price)
     if max_price is not None:
         query = query.filter(Listing.max_price <= max_price)
     if location:
         query = query.filter(Listing.location.ilike(f"%{location}%"))
+    if min_rating is not None:
+        query = query.filter(Listing.provider_rating >= min_rating)
     
-    # Get total count before pagination
-    total = query.count()
-    
-    # Apply pagination
-    query = query.offset((page - 1) * limit).limit(limit)
-    
-    # Get results
-    listings = query.all()
+    if cursor is not None:
+        # Keyset pagination: seek past the cursor, no total count
+        total, total_is_estimate = None, False
+        listings, next_cursor = paginate_listings_by_cursor(query, sort or "newest", cursor, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    else:
+        # Get total count before pagination (cached per filter set, estimated for large sets)
+        total, total_is_estimate = count_listings(
+            query, db, service_id=service_id, keyword=keyword, min_price=min_price,
+            max_price=max_price, location=location, min_rating=min_rating,
+        )
+        next_cursor = None
+
+        # Apply pagination
+        if sort:
+            query = order_listings(query, sort)
+        query = query.offset((page - 1) * limit).limit(limit)
+
+        # Get results
+        listings = query.all()
     
     # Prepare the response items with profile information
     response_items = []
@@ -258,7 +425,11 @@ def get_listings_by_service_id(
             "available": listing.available,
             "user_id": listing.user_id,
             "service_id": listing.service_id,
-            "created_at": listing.created_at
+            "created_at": listing.created_at,
+            "provider_rating": listing.provider_rating,
+            "provider_review_count": listing.provider_review_count,
+            "latitude": listing.latitude,
+            "longitude": listing.longitude
         }
         
         # Add profile information if available
@@ -278,7 +449,9 @@ def get_listings_by_service_id(
     return {
         "items": response_items,
         "total": total,
-        "page": page,
+        "page": page if cursor is None else None,
         "limit": limit,
-        "pages": (total + limit - 1) // limit  # Ceiling division to get total pages
+        "pages": (total + limit - 1) // limit if total is not None else None,  # Ceiling division to get total pages
+        "next_cursor": next_cursor,
+        "total_is_estimate": total_is_estimate
     }
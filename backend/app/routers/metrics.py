@@ -0,0 +1,49 @@
+# app/routers/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from anyio import to_thread
+
+from app.core.config import Config
+from app.core.metrics import registry
+from app.core.pool import describe_pool
+from app.database import engine, async_engine, replica_engine, async_replica_engine
+from app.sockets.socket_manager import socket_manager
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@router.get("", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text exposition of this worker's metrics"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@router.get("/db-pool", response_model=dict)
+async def get_db_pool_metrics():
+    """Live connection pool gauges, to size the pool against the request threadpool"""
+    # Sync routes (and sync dependencies) run in this threadpool, each holding
+    # at most one connection from the primary pool
+    threadpool_size = to_thread.current_default_thread_limiter().total_tokens
+    pools = [
+        describe_pool("primary", engine.pool),
+        describe_pool("async", async_engine.pool),
+    ]
+    if replica_engine is not engine:
+        pools.append(describe_pool("replica", replica_engine.pool))
+        pools.append(describe_pool("async_replica", async_replica_engine.pool))
+    return {
+        "threadpool_size": threadpool_size,
+        "config": {
+            "pool_size": Config.DB_POOL_SIZE,
+            "max_overflow": Config.DB_MAX_OVERFLOW,
+            "pool_timeout": Config.DB_POOL_TIMEOUT,
+            "pool_recycle": Config.DB_POOL_RECYCLE,
+            "pool_pre_ping": Config.DB_POOL_PRE_PING,
+        },
+        "pools": pools,
+    }
+
+@router.get("/sockets", response_model=dict)
+async def get_socket_metrics():
+    """WebSocket send queue depths and slow-consumer evictions in this worker"""
+    if not hasattr(socket_manager, "queue_stats"):
+        return {"connections": 0}
+    return socket_manager.queue_stats()
@@ -3,7 +3,6 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 import logging
 from datetime import datetime
-import asyncio
 
 from app.dependencies.db import get_db
 from app.models.notification import Notification
@@ -79,13 +78,13 @@ async def create_notification(
         
         # Broadcast to user asynchronously
         try:
-            asyncio.create_task(socket_manager.broadcast_to_user(
+            socket_manager.schedule_broadcast(
                 user_id,
                 {
                     "type": "notification",
                     "data": notification_data
                 }
-            ))
+            )
         except Exception as ws_err:
             logger.error(f"WebSocket notification error: {str(ws_err)}")
         
@@ -148,14 +147,14 @@ def create_notification_sync(
         
         # Try to broadcast via WebSocket, but catch any errors to prevent transaction issues
         try:
-            # Create async task for WebSocket broadcast
-            asyncio.create_task(socket_manager.broadcast_to_user(
+            # Hand the broadcast to the event loop (this runs in the threadpool)
+            socket_manager.schedule_broadcast(
                 user_id,
                 {
                     "type": "notification",
                     "data": notification_data
                 }
-            ))
+            )
         except Exception as ws_err:
             logger.error(f"WebSocket broadcast error: {str(ws_err)}")
             # Continue with function - don't let WebSocket issues prevent notification creation
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from app.models.profile import Profile
 from app.models.booking import Booking
 from app.models.user import User
@@ -6,7 +6,7 @@ from app.models.listing import Listing
 from app.models.review import Review
 from app.schemas.review import ReviewCreate, ReviewOut
 from pydantic import BaseModel
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from app.dependencies.db import get_db
 from app.utils.auth import get_current_user
@@ -15,6 +15,8 @@ from app.models.request import Request
 from app.models.booking import BookingStatus
 from datetime import datetime
 from app.routers.notification import create_notification_sync  # Change to sync version
+from app.utils.ratings import apply_rating_change
+from app.utils.listing_index import listing_index
 import logging
 
 # Set up logger
@@ -26,6 +28,34 @@ class ReviewUpdate(BaseModel):
 
 router = APIRouter(prefix="/reviews", tags=["Reviews"])
 
+def get_enriched_reviews(db: Session, *filters, page: int = 1, limit: Optional[int] = None) -> List[Review]:
+    """
+    Reviews matching `filters` with reviewer_name, service_title and listing_id
+    filled in from a single joined select (review -> booking -> quote ->
+    request -> listing, plus the reviewer's profile).
+    Newest first; paginated when `limit` is given.
+    """
+    query = (
+        db.query(Review, Profile.full_name, Listing.id, Listing.title)
+        .outerjoin(Booking, Review.booking_id == Booking.id)
+        .outerjoin(Quote, Booking.quote_id == Quote.id)
+        .outerjoin(Request, Quote.request_id == Request.id)
+        .outerjoin(Listing, Request.listing_id == Listing.id)
+        .outerjoin(Profile, Profile.user_id == Review.reviewer_id)
+        .filter(*filters)
+        .order_by(Review.created_at.desc(), Review.id.desc())
+    )
+    if limit is not None:
+        query = query.offset((page - 1) * limit).limit(limit)
+
+    reviews = []
+    for review, reviewer_name, listing_id, listing_title in query.all():
+        review.reviewer_name = reviewer_name or f"Customer #{review.reviewer_id}"
+        review.service_title = listing_title
+        review.listing_id = listing_id
+        reviews.append(review)
+    return reviews
+
 # 1. Submit review (customer only, but now allow provider too)
 @router.post("/", response_model=ReviewOut)
 def create_review(data: ReviewCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
@@ -63,8 +93,12 @@ def create_review(data: ReviewCreate, db: Session = Depends(get_db), current_use
 
     # Set the has_review flag on the booking
     booking.has_review = True
+
+    # Update the reviewee's rating totals in the same transaction
+    apply_rating_change(db, reviewee_id, 1, data.rating)
     db.commit()
     db.refresh(review)
+    listing_index.refresh_user_listings(db, reviewee_id)
     
     # Send notification to reviewee
     try:
@@ -92,62 +126,44 @@ def create_review(data: ReviewCreate, db: Session = Depends(get_db), current_use
             logger.warning(f"Failed to create notification for review {review.id}")
     except Exception as e:
         logger.error(f"Error creating notification for review {review.id}: {str(e)}", exc_info=True)
-    
-    # Update average rating for the reviewee (provider or customer)
-    profile = db.query(Profile).filter(Profile.user_id == reviewee_id).first()
-    if profile:
-        all_reviews = db.query(Review).filter(Review.reviewee_id == reviewee_id).all()
-        if all_reviews:
-            profile.average_rating = sum(r.rating for r in all_reviews) / len(all_reviews)
-        else:
-            profile.average_rating = None
-        db.commit()
 
     return review
 
 # 2. Get all reviews for me (as provider)
 @router.get("/me/received", response_model=List[ReviewOut])
-def get_reviews_about_me(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_reviews_about_me(
+    page: int = Query(1, ge=1),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     """Get all reviews where current user is the reviewee (for providers)"""
-    return db.query(Review).filter_by(reviewee_id=current_user.id).all()
+    return get_enriched_reviews(db, Review.reviewee_id == current_user.id, page=page, limit=limit)
 
 # Add new endpoint for reviews WRITTEN by me (as customer)
 @router.get("/me/written", response_model=List[ReviewOut])
-def get_reviews_written_by_me(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_reviews_written_by_me(
+    page: int = Query(1, ge=1),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     """Get all reviews where current user is the reviewer (for customers)"""
-    reviews = db.query(Review).filter_by(reviewer_id=current_user.id).all()
-    
-    # Enhance reviews with service information
-    for review in reviews:
-        # Get booking to find the associated service
-        booking = db.query(Booking).filter(Booking.id == review.booking_id).first()
-        
-        if booking:
-            # Get quote to find the request
-            quote = db.query(Quote).filter(Quote.id == booking.quote_id).first()
-            
-            if quote:
-                # Get request to find the listing
-                request = db.query(Request).filter(Request.id == quote.request_id).first()
-                
-                if request:
-                    # Get listing info
-                    listing = db.query(Listing).filter(Listing.id == request.listing_id).first()
-                    
-                    if listing:
-                        review.service_title = listing.title
-                        review.listing_id = listing.id
-    
-    return reviews
+    return get_enriched_reviews(db, Review.reviewer_id == current_user.id, page=page, limit=limit)
 
 # Keep the original /me endpoint for backward compatibility but make it role-aware
 @router.get("/me", response_model=List[ReviewOut])
-def get_my_reviews(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_my_reviews(
+    page: int = Query(1, ge=1),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     """Get reviews based on user role - reviews about me for providers, reviews by me for customers"""
     if current_user.role == "provider":
-        return get_reviews_about_me(db=db, current_user=current_user)
+        return get_reviews_about_me(page=page, limit=limit, db=db, current_user=current_user)
     else:
-        return get_reviews_written_by_me(db=db, current_user=current_user)
+        return get_reviews_written_by_me(page=page, limit=limit, db=db, current_user=current_user)
 
 # 3. Get single review
 @router.get("/{review_id}", response_model=ReviewOut)
@@ -177,115 +193,41 @@ def get_review_by_booking_id(booking_id: int, db: Session = Depends(get_db), cur
 
 # Add this endpoint to your existing review.py router
 @router.get("/listing/{listing_id}", response_model=List[ReviewOut])
-def get_reviews_by_listing_id(listing_id: int, db: Session = Depends(get_db)):
+def get_reviews_by_listing_id(
+    listing_id: int,
+    page: int = Query(1, ge=1),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
     """Get all reviews for a specific listing"""
-    
-    # First find all bookings for this listing via quotes
-    bookings_query = (
-        db.query(Booking)
-        .join(Quote, Booking.quote_id == Quote.id)
-        .join(Request, Quote.request_id == Request.id)
-        .filter(Request.listing_id == listing_id)
+    # Only include reviews written by customers about the provider (not vice versa)
+    return get_enriched_reviews(
+        db,
+        Request.listing_id == listing_id,
+        Review.reviewer.has(User.role == "customer"),
+        page=page,
+        limit=limit
     )
-    
-    booking_ids = [booking.id for booking in bookings_query.all()]
-    
-    if not booking_ids:
-        return []
-    
-    # Find all reviews for these bookings - MODIFIED: only include reviews where:
-    # 1. The reviewer is a customer (has role "customer")
-    # 2. The reviewer is reviewing the provider (not vice versa)
-    reviews_query = (
-        db.query(Review)
-        .join(Booking, Review.booking_id == Booking.id)
-        .join(User, Review.reviewer_id == User.id)
-        .filter(Review.booking_id.in_(booking_ids))
-        .filter(User.role == "customer")  # Only include reviews by customers
-    )
-    
-    reviews = reviews_query.all()
-    
-    # Enhance reviews with reviewer name and service name
-    for review in reviews:
-        # Add reviewer name
-        user = db.query(User).filter(User.id == review.reviewer_id).first()
-        if user and user.profile:
-            review.reviewer_name = user.profile.full_name
-        else:
-            # Instead of leaving it null, set to "Customer" with ID
-            review.reviewer_name = f"Customer #{review.reviewer_id}"
-        
-        # Add service name from the booking -> quote -> request -> listing chain
-        booking = db.query(Booking).filter(Booking.id == review.booking_id).first()
-        if booking:
-            quote = db.query(Quote).filter(Quote.id == booking.quote_id).first()
-            if quote:
-                request = db.query(Request).filter(Request.id == quote.request_id).first()
-                if request:
-                    listing = db.query(Listing).filter(Listing.id == request.listing_id).first()
-                    if listing:
-                        review.service_name = listing.title
-    
-    return reviews
 
 @router.get("/customer/{user_id}", response_model=List[ReviewOut])
-def get_reviews_by_customer_id(user_id: int, db: Session = Depends(get_db)):
+def get_reviews_by_customer_id(
+    user_id: int,
+    page: int = Query(1, ge=1),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
     """Get all reviews made by a specific customer"""
-    
-    # Find all reviews where the reviewer is the specified user
-    reviews = db.query(Review).filter(Review.reviewer_id == user_id).all()
-    
-    # Enhance reviews with service information
-    for review in reviews:
-        # Get booking to find the associated service
-        booking = db.query(Booking).filter(Booking.id == review.booking_id).first()
-        
-        if booking:
-            # Get quote to find the request
-            quote = db.query(Quote).filter(Quote.id == booking.quote_id).first()
-            
-            if quote:
-                # Get request to find the listing
-                request = db.query(Request).filter(Request.id == quote.request_id).first()
-                
-                if request:
-                    # Get listing info
-                    listing = db.query(Listing).filter(Listing.id == request.listing_id).first()
-                    
-                    if listing:
-                        review.service_title = listing.title
-                        review.listing_id = listing.id
-    
-    return reviews
+    return get_enriched_reviews(db, Review.reviewer_id == user_id, page=page, limit=limit)
 
 @router.get("/about/{user_id}", response_model=List[ReviewOut])
-def get_reviews_about_user(user_id: int, db: Session = Depends(get_db)):
+def get_reviews_about_user(
+    user_id: int,
+    page: int = Query(1, ge=1),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
     """Get all reviews where specified user is the reviewee (for viewing provider profiles)"""
-    reviews = db.query(Review).filter_by(reviewee_id=user_id).all()
-    
-    # Enhance reviews with reviewer name
-    for review in reviews:
-        # Add reviewer name
-        user = db.query(User).filter(User.id == review.reviewer_id).first()
-        if user and user.profile:
-            review.reviewer_name = user.profile.full_name
-        else:
-            review.reviewer_name = f"Customer #{review.reviewer_id}"
-        
-        # Add service information if available
-        booking = db.query(Booking).filter(Booking.id == review.booking_id).first()
-        if booking:
-            quote = db.query(Quote).filter(Quote.id == booking.quote_id).first()
-            if quote:
-                request = db.query(Request).filter(Request.id == quote.request_id).first()
-                if request:
-                    listing = db.query(Listing).filter(Listing.id == request.listing_id).first()
-                    if listing:
-                        review.service_title = listing.title
-                        review.listing_id = listing.id
-    
-    return reviews
+    return get_enriched_reviews(db, Review.reviewee_id == user_id, page=page, limit=limit)
 
 @router.put("/{review_id}", response_model=ReviewOut)
 def update_review(
@@ -303,20 +245,14 @@ def update_review(
     if not booking or booking.status != BookingStatus.completed:
         raise HTTPException(status_code=400, detail="Can only edit review for completed bookings")
 
+    # Shift the reviewee's rating totals by the change in rating
+    apply_rating_change(db, review.reviewee_id, 0, data.rating - review.rating)
+
     review.rating = data.rating
     review.comment = data.comment
     review.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(review)
-
-    provider_id = review.reviewee_id
-    profile = db.query(Profile).filter(Profile.user_id == provider_id).first()
-    if profile:
-        all_reviews = db.query(Review).filter(Review.reviewee_id == provider_id).all()
-        if all_reviews:
-            profile.average_rating = sum(r.rating for r in all_reviews) / len(all_reviews)
-        else:
-            profile.average_rating = None
-        db.commit()
+    listing_index.refresh_user_listings(db, review.reviewee_id)
 
     return review
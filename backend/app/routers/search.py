@@ -0,0 +1,21 @@
+# app/routers/search.py
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.dependencies.db import get_db
+from app.schemas.search import Suggestion
+from app.utils.suggest import suggestions
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+@router.get("/suggest", response_model=List[Suggestion])
+def suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """Top completions for a partial query from listing titles, service names and category names"""
+    suggestions.ensure_ready(db)
+    return suggestions.suggest(q, limit)
@@ -6,6 +6,9 @@ from app.models.service import Service
 from app.schemas.service import ServiceCreate, ServiceUpdate, ServiceOut
 from app.models.category import Category
 from app.dependencies.db import get_db
+from app.models.listing import Listing
+from app.utils.listing_index import listing_index
+from app.utils.suggest import suggestions
 
 router = APIRouter(prefix="/services", tags=["Services"])
 
@@ -42,6 +45,7 @@ async def create_service(
     db.add(service)
     db.commit()
     db.refresh(service)
+    suggestions.upsert("service", service.id, service.name)
     return service
 
 @router.get("/", response_model=list[ServiceOut])
@@ -74,6 +78,7 @@ async def update_service(
             raise HTTPException(status_code=404, detail="Category not found")
         service.category_id = category_id
 
+    renamed = name is not None and name != service.name
     if name is not None:
         service.name = name
     if description is not None:
@@ -91,6 +96,10 @@ async def update_service(
 
     db.commit()
     db.refresh(service)
+    suggestions.upsert("service", service.id, service.name)
+    # Listing documents carry the service name
+    if renamed:
+        listing_index.refresh(db, Listing.service_id == service.id)
     return service
 
 @router.delete("/{service_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -100,4 +109,7 @@ def delete_service(service_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Service not found")
     db.delete(service)
     db.commit()
+    listing_index.remove_service_listings(service_id)
+    # Deleting a service cascades to its listings: reload everything
+    suggestions.refresh(db)
     return None
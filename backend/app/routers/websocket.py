@@ -1,8 +1,9 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
 import logging
+from typing import Optional
 from uuid import uuid4
-import json
 
+from app.sockets.encoding import decode, negotiate
 from app.utils.auth import verify_token_ws
 from app.sockets.socket_manager import socket_manager
 from app.models.user import User
@@ -15,6 +16,10 @@ router = APIRouter(tags=["WebSockets"])
 async def websocket_endpoint(
     websocket: WebSocket, 
     token: str = Query(...),
+    encoding: Optional[str] = Query(None, description="json (default) or msgpack for binary frames"),
+    last_seq: Optional[int] = Query(None, ge=0, description="Last seq received, to replay missed broadcasts"),
+    stream: Optional[str] = Query(None, description="stream from the previous connection_established"),
+    heartbeat: bool = Query(False, description="Receive {type: ping} when silent; the client must answer in time"),
 ):
     # Generate a unique socket ID
     socket_id = str(uuid4())
@@ -32,21 +37,26 @@ async def websocket_endpoint(
     
     # Accept the connection and add to the socket manager
     try:
-        await socket_manager.connect(websocket, socket_id, user.id)
+        await socket_manager.connect(websocket, socket_id, user.id, negotiate(encoding), last_seq, stream, heartbeat)
         
         # Keep the connection open and handle messages
         while True:
-            data = await websocket.receive_text()
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+            data = received.get("text") if received.get("text") is not None else received.get("bytes")
+            socket_manager.touch(socket_id)
             try:
-                message = json.loads(data)
-                # Handle client messages if needed
+                message = decode(data)
+                # Handle client messages if needed ("pong" answers a server
+                # ping; receiving it already marked the socket alive)
                 if message.get("type") == "heartbeat":
                     await socket_manager.send_personal_message(
                         {"type": "heartbeat_response", "timestamp": message.get("timestamp")},
                         socket_id
                     )
-            except json.JSONDecodeError:
-                logger.warning(f"Received invalid JSON: {data}")
+            except ValueError:
+                logger.warning(f"Received invalid message: {data!r}")
             except Exception as e:
                 logger.error(f"Error processing message: {str(e)}")
                 
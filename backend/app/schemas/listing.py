@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Optional, Union
 from datetime import datetime
 
 # Base listing model with common properties
@@ -9,6 +9,8 @@ class ListingBase(BaseModel):
     min_price: float
     max_price: float
     location: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     available: bool = True
     service_id: int
 
@@ -21,10 +23,20 @@ class ListingOut(ListingBase):
     id: int
     user_id: int
     created_at: Optional[datetime] = None  # Make the field optional
+    provider_rating: Optional[float] = None
+    provider_review_count: Optional[int] = None
 
     class Config:
         from_attributes = True
 
+# Listing returned by a radius search (/listings/?near=...), with its distance
+class ListingDistanceOut(ListingOut):
+    distance_km: float
+
+# A /listings/ result: with distance_km for radius searches, plain otherwise
+# (left to right, so only items carrying a distance use ListingDistanceOut)
+ListingSearchItem = Annotated[Union[ListingDistanceOut, ListingOut], Field(union_mode="left_to_right")]
+
 # Add this new model for profile data
 class ProfileInfo(BaseModel):
     id: int
@@ -44,13 +56,47 @@ class ListingOutWithProfile(ListingOut):
     class Config:
         from_attributes = True
 
+# One entry of /listings/{id}/similar (similarity is cosine, 0..1)
+class SimilarListingOut(ListingOut):
+    similarity: float
+
+# Response of /listings/batch: found listings in request order, plus ids that don't exist
+class ListingBatchResponse(BaseModel):
+    items: List[ListingOutWithProfile]
+    missing: List[int]
+
 # New model for paginated listing responses
+# (total, page and pages are omitted in cursor mode, which returns next_cursor;
+# total_is_estimate marks a planner estimate for very large result sets)
 class PaginatedListingResponse(BaseModel):
     items: List[ListingOutWithProfile]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     limit: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
 
     class Config:
         from_attributes = True
+
+# Facet counts returned by /listings/?facets=...
+class FacetCount(BaseModel):
+    value: Union[int, str]
+    count: int
+
+class PriceBucketCount(BaseModel):
+    min: float
+    max: Optional[float] = None  # None for the open-ended top bucket
+    label: str
+    count: int
+
+class ListingFacets(BaseModel):
+    service: Optional[List[FacetCount]] = None
+    price: Optional[List[PriceBucketCount]] = None
+    location: Optional[List[FacetCount]] = None
+
+# /listings/ response when facets are requested
+class FacetedListingResponse(BaseModel):
+    items: List[ListingSearchItem]
+    facets: ListingFacets
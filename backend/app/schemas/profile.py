@@ -29,6 +29,7 @@ class ProfileOut(ProfileBase):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     average_rating: Optional[float] = None
+    rating_count: Optional[int] = None
     profile_picture: Optional[str] = None  # Ensure always present
 
     class Config:
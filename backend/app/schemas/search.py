@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+# One autocomplete completion from /search/suggest
+class Suggestion(BaseModel):
+    text: str
+    type: str  # "listing", "service" or "category"
+    id: int
+    weight: int
@@ -0,0 +1,274 @@
+# app/sockets/backplane.py
+"""
+Pub/sub backplanes that fan socket broadcasts out to every worker.
+
+SocketManager publishes each broadcast once; every worker (the publisher
+included) receives it from the backplane and delivers it to the sockets it
+holds locally.
+"""
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, List, Optional, Set
+from urllib.parse import urlparse
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Called for every message received from the backplane
+Deliver = Callable[[int, dict], Awaitable[None]]
+
+
+class Backplane:
+    """Base class: publish() to all workers, start() to receive"""
+    name = "base"
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._deliver: Optional[Deliver] = None
+        self.started = False
+        # Deliveries started from callbacks, held until done (the loop only
+        # keeps weak references to tasks)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def start(self, deliver: Deliver):
+        self._deliver = deliver
+        self.started = True
+
+    async def stop(self):
+        self.started = False
+
+    async def publish(self, user_id: int, message: dict):
+        raise NotImplementedError
+
+    def encode(self, user_id: int, message: dict) -> str:
+        return json.dumps({"user_id": user_id, "message": message})
+
+    async def _receive(self, payload) -> None:
+        try:
+            envelope = json.loads(payload)
+            await self._deliver(envelope["user_id"], envelope["message"])
+        except Exception as e:
+            logger.error(f"{self.name} backplane: could not deliver message: {e}")
+
+
+class InMemoryBackplane(Backplane):
+    """Single-process stand-in (development and tests): delivers directly"""
+    name = "memory"
+
+    async def publish(self, user_id: int, message: dict):
+        if self._deliver is not None:
+            await self._deliver(user_id, message)
+
+
+class PostgresBackplane(Backplane):
+    """
+    LISTEN/NOTIFY on the application database, via a dedicated asyncpg
+    connection per worker. NOTIFY payloads are limited to 8000 bytes,
+    which notification messages stay far below.
+    """
+    name = "postgres"
+    RECONNECT_SECONDS = 2.0
+
+    def __init__(self, channel: str, url: str):
+        super().__init__(channel)
+        # asyncpg takes a plain libpq URL (no SQLAlchemy +driver suffix)
+        self.url = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._connection = None
+        self._watchdog: Optional[asyncio.Task] = None
+        self._publish_lock = asyncio.Lock()
+
+    async def _connect(self):
+        import asyncpg
+
+        connection = await asyncpg.connect(self.url)
+        await connection.add_listener(self.channel, self._on_notify)
+        self._connection = connection
+        logger.info(f"Postgres backplane listening on channel '{self.channel}'")
+
+    def _on_notify(self, connection, pid, channel, payload):
+        task = asyncio.get_running_loop().create_task(self._receive(payload))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _keep_connected(self):
+        while self.started:
+            try:
+                if self._connection is None or self._connection.is_closed():
+                    await self._connect()
+            except Exception as e:
+                logger.error(f"Postgres backplane connection failed: {e}")
+                self._connection = None
+            await asyncio.sleep(self.RECONNECT_SECONDS)
+
+    async def start(self, deliver: Deliver):
+        # Connects (and reconnects) in the background, so an unreachable
+        # database does not stop the app from starting
+        await super().start(deliver)
+        self._watchdog = asyncio.create_task(self._keep_connected())
+
+    async def stop(self):
+        await super().stop()
+        if self._watchdog:
+            self._watchdog.cancel()
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+
+    async def publish(self, user_id: int, message: dict):
+        if self._connection is None or self._connection.is_closed():
+            raise ConnectionError("not connected")
+        async with self._publish_lock:
+            await self._connection.execute("SELECT pg_notify($1, $2)", self.channel, self.encode(user_id, message))
+
+
+class CommandNotSent(ConnectionError):
+    """The connection was closed before the command was written: safe to retry"""
+
+
+class RespConnection:
+    """Minimal client for the Redis wire protocol (RESP2): commands and replies"""
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader, self.writer = reader, writer
+
+    @classmethod
+    async def open(cls, url: str) -> "RespConnection":
+        parsed = urlparse(url)
+        reader, writer = await asyncio.open_connection(parsed.hostname or "localhost", parsed.port or 6379)
+        connection = cls(reader, writer)
+        if parsed.password:
+            args = ["AUTH", parsed.username, parsed.password] if parsed.username else ["AUTH", parsed.password]
+            await connection.command(*args)
+        return connection
+
+    async def send(self, *args):
+        if self.writer.is_closing() or self.reader.at_eof():
+            raise CommandNotSent("connection closed")
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self.writer.write(b"".join(parts))
+        await self.writer.drain()
+
+    async def read(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("connection closed")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RuntimeError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = await self.reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [await self.read() for _ in range(length)]
+        raise RuntimeError(f"unexpected reply {line!r}")
+
+    async def command(self, *args):
+        await self.send(*args)
+        return await self.read()
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except Exception:
+            pass
+
+
+class RedisBackplane(Backplane):
+    """
+    PUBLISH/SUBSCRIBE over the Redis protocol (Redis, Valkey, KeyDB, ...),
+    spoken directly so no client library is needed. One subscriber and one
+    publisher connection per worker.
+    """
+    name = "redis"
+    RECONNECT_SECONDS = 2.0
+
+    def __init__(self, channel: str, url: str):
+        super().__init__(channel)
+        self.url = url
+        self._publisher: Optional[RespConnection] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._publish_lock = asyncio.Lock()
+
+    async def _subscribe_loop(self):
+        while self.started:
+            subscriber = None
+            try:
+                subscriber = await RespConnection.open(self.url)
+                await subscriber.command("SUBSCRIBE", self.channel)
+                logger.info(f"Redis backplane subscribed to channel '{self.channel}'")
+                while True:
+                    reply = await subscriber.read()
+                    if isinstance(reply, list) and reply and reply[0] == b"message":
+                        await self._receive(reply[2])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis backplane subscription lost: {e}")
+            finally:
+                if subscriber is not None:
+                    await subscriber.close()
+            await asyncio.sleep(self.RECONNECT_SECONDS)
+
+    async def start(self, deliver: Deliver):
+        # The publisher connects on first use, so an unreachable server does
+        # not stop the app from starting
+        await super().start(deliver)
+        self._reader_task = asyncio.create_task(self._subscribe_loop())
+
+    async def stop(self):
+        await super().stop()
+        if self._reader_task:
+            self._reader_task.cancel()
+        if self._publisher:
+            await self._publisher.close()
+
+    async def publish(self, user_id: int, message: dict):
+        payload = self.encode(user_id, message)
+        async with self._publish_lock:
+            try:
+                if self._publisher is None:
+                    self._publisher = await RespConnection.open(self.url)
+                try:
+                    await self._publisher.command("PUBLISH", self.channel, payload)
+                except CommandNotSent:
+                    # The server closed the idle connection and nothing was
+                    # written, so reconnecting cannot publish the message twice
+                    await self._publisher.close()
+                    self._publisher = await RespConnection.open(self.url)
+                    await self._publisher.command("PUBLISH", self.channel, payload)
+            except (ConnectionError, OSError, asyncio.IncompleteReadError):
+                # Possibly published already: not repeated. The next publish reconnects
+                if self._publisher is not None:
+                    await self._publisher.close()
+                    self._publisher = None
+                raise
+
+
+BACKPLANES: List[str] = ["memory", "postgres", "redis"]
+
+
+def create_backplane() -> Backplane:
+    """The backplane selected by SOCKET_BACKPLANE"""
+    kind = Config.SOCKET_BACKPLANE
+    channel = Config.SOCKET_BACKPLANE_CHANNEL
+    if kind == "postgres":
+        return PostgresBackplane(channel, Config.SOCKET_BACKPLANE_URL or Config.SQLALCHEMY_DATABASE_URI)
+    if kind == "redis":
+        return RedisBackplane(channel, Config.SOCKET_BACKPLANE_URL or "redis://localhost:6379")
+    if kind != "memory":
+        raise ValueError(f"Unknown SOCKET_BACKPLANE '{kind}' (expected one of {', '.join(BACKPLANES)})")
+    return InMemoryBackplane(channel)
@@ -0,0 +1,60 @@
+# app/sockets/encoding.py
+"""
+Wire encodings for WebSocket messages.
+
+Clients pick one when connecting (/ws?encoding=msgpack); JSON goes out as
+text frames, MessagePack as binary frames. A message is wrapped in a Frame
+once per broadcast, and each encoding of it is computed at most once no
+matter how many sockets it goes to.
+"""
+import json
+from typing import Dict, Optional, Union
+
+try:
+    import msgpack
+except ImportError:  # optional: without it every client gets JSON
+    msgpack = None
+
+JSON = "json"
+MSGPACK = "msgpack"
+
+Payload = Union[str, bytes]
+
+
+def available_encodings():
+    return [JSON, MSGPACK] if msgpack is not None else [JSON]
+
+
+def negotiate(requested: Optional[str]) -> str:
+    """The encoding to use for a client that asked for `requested`"""
+    return requested if requested in available_encodings() else JSON
+
+
+def encode(message: dict, encoding: str) -> Payload:
+    if encoding == MSGPACK:
+        return msgpack.packb(message, use_bin_type=True)
+    return json.dumps(message)
+
+
+def decode(data: Payload) -> dict:
+    """A client message from either a text (JSON) or a binary (MessagePack) frame"""
+    if isinstance(data, bytes):
+        if msgpack is None:
+            raise ValueError("binary frames need msgpack")
+        return msgpack.unpackb(data, raw=False)
+    return json.loads(data)
+
+
+class Frame:
+    """A message plus its encodings, computed on first use and shared"""
+    __slots__ = ("message", "_encoded")
+
+    def __init__(self, message: dict):
+        self.message = message
+        self._encoded: Dict[str, Payload] = {}
+
+    def encoded(self, encoding: str) -> Payload:
+        payload = self._encoded.get(encoding)
+        if payload is None:
+            payload = self._encoded[encoding] = encode(self.message, encoding)
+        return payload
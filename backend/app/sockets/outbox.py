@@ -0,0 +1,75 @@
+# app/sockets/outbox.py
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from fastapi import WebSocket
+
+from app.sockets.encoding import JSON, Frame
+
+logger = logging.getLogger(__name__)
+
+# Called once when a socket must be evicted: (socket_id, reason)
+OnFailure = Callable[[str, str], Awaitable[None]]
+
+
+class Outbox:
+    """
+    Bounded outbound queue for one socket, drained by its own writer task.
+
+    put() never waits: a full queue means the client is not keeping up and
+    the caller evicts it. A send that stays blocked past send_timeout also
+    evicts the client, so one stalled socket never holds up the others.
+    """
+    def __init__(self, socket_id: str, websocket: WebSocket, maxsize: int, send_timeout: float,
+                 on_failure: OnFailure, encoding: str = JSON):
+        self.socket_id = socket_id
+        self.websocket = websocket
+        self.encoding = encoding
+        self.send_timeout = send_timeout
+        self.on_failure = on_failure
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.sent = 0
+        # When the send in progress started (None while idle)
+        self.sending_since: Optional[float] = None
+        self.task = asyncio.create_task(self._run())
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    def put(self, frame: Frame) -> bool:
+        """Queue a frame; False if the queue is full"""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _run(self):
+        while True:
+            frame = await self.queue.get()
+            self.sending_since = time.monotonic()
+            try:
+                payload = frame.encoded(self.encoding)
+                if isinstance(payload, bytes):
+                    send = self.websocket.send_bytes(payload)
+                else:
+                    send = self.websocket.send_text(payload)
+                await asyncio.wait_for(send, self.send_timeout)
+            except asyncio.TimeoutError:
+                await self.on_failure(self.socket_id, "send_timeout")
+                return
+            except Exception as e:
+                logger.debug(f"Send to socket {self.socket_id} failed: {str(e)}")
+                await self.on_failure(self.socket_id, "send_error")
+                return
+            finally:
+                self.sending_since = None
+            self.sent += 1
+
+    def close(self):
+        """Stop the writer (unless called from the writer itself)"""
+        if self.task is not asyncio.current_task():
+            self.task.cancel()
@@ -0,0 +1,104 @@
+# app/sockets/replay.py
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional, Set, Tuple
+from uuid import uuid4
+
+from app.sockets.encoding import Frame
+
+
+class _History:
+    __slots__ = ("seq", "frames")
+
+    def __init__(self, size: int, seq: int = 0):
+        self.seq = seq
+        self.frames: Deque[Frame] = deque(maxlen=size)
+
+
+class ReplayBuffer:
+    """
+    Per-user sequence numbers and the last `size` broadcasts to each user,
+    so a reconnecting client can catch up from memory (?last_seq=).
+
+    Sequences are per worker: `stream` identifies this buffer, and a client
+    that reconnects to another worker (or after a restart) presents a
+    different stream and is told the replay is incomplete. Histories are
+    kept for the `max_users` most recently active users, including ones
+    that are currently disconnected (that is the gap being replayed).
+    Connected users (between track() and untrack()) are never evicted, so
+    the limit can be exceeded while more users than that are connected.
+
+    A user whose history was evicted starts again above every sequence
+    number evicted so far, leaving a gap, so a client still holding an old
+    number is told its replay is incomplete rather than being handed a
+    restarted sequence.
+    """
+    def __init__(self, size: int, max_users: int):
+        self.size = size
+        self.max_users = max_users
+        self.stream = uuid4().hex[:12]
+        self._histories: "OrderedDict[int, _History]" = OrderedDict()
+        self._connected: Set[int] = set()
+        # Highest sequence number of any evicted history
+        self._evicted_seq = 0
+
+    def __len__(self):
+        return len(self._histories)
+
+    def _history(self, user_id: int, create: bool) -> Optional[_History]:
+        history = self._histories.get(user_id)
+        if history is not None:
+            self._histories.move_to_end(user_id)
+        elif create:
+            start = self._evicted_seq + 1 if self._evicted_seq else 0
+            history = self._histories[user_id] = _History(self.size, start)
+            if len(self._histories) > self.max_users:
+                self._evict()
+        return history
+
+    def _evict(self):
+        """Drop the least recently active history of a disconnected user"""
+        for user_id in self._histories:
+            if user_id not in self._connected:
+                evicted = self._histories.pop(user_id)
+                self._evicted_seq = max(self._evicted_seq, evicted.seq)
+                return
+
+    def track(self, user_id: int):
+        """Start (or keep) recording broadcasts to a connected user"""
+        self._connected.add(user_id)
+        self._history(user_id, create=True)
+
+    def untrack(self, user_id: int):
+        """The user's last socket closed: keep the history, but allow evicting it"""
+        self._connected.discard(user_id)
+
+    def latest(self, user_id: int) -> int:
+        history = self._histories.get(user_id)
+        return history.seq if history is not None else 0
+
+    def record(self, user_id: int, message: dict, track: bool = False) -> Frame:
+        """
+        Stamp the next sequence number on a broadcast and keep it. Messages
+        to users that are not tracked go out unstamped.
+        """
+        history = self._history(user_id, create=track)
+        if history is None:
+            return Frame(message)
+        history.seq += 1
+        frame = Frame({**message, "seq": history.seq})
+        history.frames.append(frame)
+        return frame
+
+    def since(self, user_id: int, last_seq: int, stream: Optional[str] = None) -> Tuple[List[Frame], bool]:
+        """
+        Buffered broadcasts after `last_seq`, and whether they cover the
+        whole gap (False if the stream changed or older ones were dropped).
+        """
+        history = self._histories.get(user_id)
+        if (stream is not None and stream != self.stream) or history is None:
+            return [], last_seq == 0 and stream in (None, self.stream)
+        if last_seq > history.seq:
+            return [], False
+        frames = [frame for frame in history.frames if frame.message["seq"] > last_seq]
+        oldest = frames[0].message["seq"] if frames else history.seq + 1
+        return frames, oldest == last_seq + 1
@@ -1,45 +1,108 @@
+import asyncio
 import logging
-from typing import Dict, Set
+import time
+from typing import Dict, Optional, Set, Union
 from fastapi import WebSocket, WebSocketDisconnect
-import json
+
+from app.core.config import Config
+from app.core.metrics import notification_broadcasts_total, websocket_evictions_total
+from app.sockets.backplane import Backplane, create_backplane
+from app.sockets.encoding import JSON, Frame
+from app.sockets.outbox import Outbox
+from app.sockets.replay import ReplayBuffer
 
 logger = logging.getLogger(__name__)
 
 class SocketManager:
     """
     Manages WebSocket connections and room-based messaging.
+
+    Connections are local to this worker. Broadcasts go through the
+    backplane (SOCKET_BACKPLANE), so a user connected to any worker gets
+    messages published by every worker.
     """
-    def __init__(self):
+    def __init__(self, backplane: Optional[Backplane] = None):
         # Map user_id to set of socket IDs
         self.user_connections: Dict[int, Set[str]] = {}
         # Map socket ID to WebSocket instance
         self.active_connections: Dict[str, WebSocket] = {}
         # Map socket ID to user_id
         self.socket_to_user: Dict[str, int] = {}
+        self.backplane = backplane or create_backplane()
+        # Map socket ID to its send queue and writer task
+        self.outboxes: Dict[str, Outbox] = {}
+        # Map socket ID to when the client was last heard from (monotonic),
+        # for sockets that opted in to server pings (?heartbeat=true)
+        self.last_seen: Dict[str, float] = {}
+        # Map socket ID to when its unanswered ping was sent
+        self.pings: Dict[str, float] = {}
+        # Sockets collected by the last reap()
+        self.last_reaped = 0
+        # Recent broadcasts per user, replayed to clients reconnecting with last_seq
+        self.replay = ReplayBuffer(Config.SOCKET_REPLAY_BUFFER_SIZE, Config.SOCKET_REPLAY_USERS)
+        # Event loop the sockets live on, for broadcasts from sync code
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        # Fire-and-forget tasks (evictions, scheduled broadcasts): the loop
+        # only keeps weak references, so they are held here until done
+        self._tasks: Set[asyncio.Task] = set()
         
-        logger.info("SocketManager initialized")
+        logger.info(f"SocketManager initialized ({self.backplane.name} backplane)")
+
+    async def start(self):
+        """Start receiving broadcasts from the backplane (called at app startup)"""
+        self.loop = asyncio.get_running_loop()
+        await self.backplane.start(self.deliver_to_user)
 
-    async def connect(self, websocket: WebSocket, socket_id: str, user_id: int):
-        """Connect a user's WebSocket and add to their room"""
+    async def stop(self):
+        await self.backplane.stop()
+
+    async def connect(self, websocket: WebSocket, socket_id: str, user_id: int, encoding: str = JSON,
+                      last_seq: Optional[int] = None, stream: Optional[str] = None, heartbeat: bool = False):
+        """
+        Connect a user's WebSocket (sending in `encoding`) and add to their
+        room. A reconnecting client passes the last sequence number (and
+        stream) it saw to get the broadcasts it missed. With `heartbeat`
+        the client is pinged when silent and must answer (see keep_alive).
+        """
         await websocket.accept()
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
         
         # Store the connection
         self.active_connections[socket_id] = websocket
         self.socket_to_user[socket_id] = user_id
+        self.outboxes[socket_id] = Outbox(
+            socket_id, websocket, Config.SOCKET_SEND_QUEUE_SIZE, Config.SOCKET_SEND_TIMEOUT_SECONDS, self.evict,
+            encoding,
+        )
+        if heartbeat:
+            self.last_seen[socket_id] = time.monotonic()
         
         # Add to user's room
         if user_id not in self.user_connections:
             self.user_connections[user_id] = set()
         self.user_connections[user_id].add(socket_id)
+        self.replay.track(user_id)
         
         logger.info(f"User {user_id} connected with socket {socket_id}")
         logger.debug(f"Active users: {len(self.user_connections)}, Active connections: {len(self.active_connections)}")
         
-        # Send confirmation to client
-        await self.send_personal_message(
-            {"type": "connection_established", "user_id": user_id},
+        # Send confirmation to client, then any missed broadcasts. Nothing
+        # awaits in between, so no new broadcast can slip ahead of the replay.
+        self.enqueue(
+            {
+                "type": "connection_established", "user_id": user_id, "encoding": encoding,
+                "heartbeat": heartbeat,
+                "seq": self.replay.latest(user_id), "stream": self.replay.stream,
+            },
             socket_id
         )
+        if last_seq is not None:
+            frames, complete = self.replay.since(user_id, last_seq, stream)
+            for frame in frames:
+                self.enqueue(frame, socket_id)
+            # Incomplete means the client must refetch what it missed
+            self.enqueue({"type": "replay_complete", "replayed": len(frames), "complete": complete}, socket_id)
 
     async def disconnect(self, socket_id: str):
         """Disconnect a socket and clean up references"""
@@ -51,6 +114,7 @@ class SocketManager:
                 self.user_connections[user_id].discard(socket_id)
                 if not self.user_connections[user_id]:
                     del self.user_connections[user_id]
+                    self.replay.untrack(user_id)
             
             # Clean up mappings
             del self.socket_to_user[socket_id]
@@ -60,33 +124,174 @@ class SocketManager:
         # Remove the connection
         if socket_id in self.active_connections:
             del self.active_connections[socket_id]
+        self.last_seen.pop(socket_id, None)
+        self.pings.pop(socket_id, None)
+        outbox = self.outboxes.pop(socket_id, None)
+        if outbox is not None:
+            outbox.close()
             
         logger.debug(f"Active users: {len(self.user_connections)}, Active connections: {len(self.active_connections)}")
 
+    def touch(self, socket_id: str):
+        """Record that the client sent something (any message counts as a pong)"""
+        if socket_id in self.last_seen:
+            self.last_seen[socket_id] = time.monotonic()
+            self.pings.pop(socket_id, None)
+
+    async def evict(self, socket_id: str, reason: str, code: int = 1013):
+        """Drop a client that is not keeping up or not responding; it can reconnect"""
+        websocket = self.active_connections.get(socket_id)
+        if websocket is None:
+            return
+        logger.warning(f"Evicting socket {socket_id} of user {self.socket_to_user.get(socket_id)}: {reason}")
+        websocket_evictions_total.inc(reason=reason)
+        await self.disconnect(socket_id)
+        try:
+            # Bounded, since the client may not be reading at all
+            await asyncio.wait_for(websocket.close(code=code), Config.SOCKET_SEND_TIMEOUT_SECONDS)
+        except Exception:
+            pass
+
+    def enqueue(self, message: Union[dict, Frame], socket_id: str) -> bool:
+        """
+        Queue a message for a socket without waiting for it to be sent.
+        A full queue evicts the socket.
+        """
+        outbox = self.outboxes.get(socket_id)
+        if outbox is None:
+            return False
+        if outbox.put(message if isinstance(message, Frame) else Frame(message)):
+            return True
+        self._spawn(self.evict(socket_id, "queue_full"), asyncio.get_running_loop())
+        return False
+
+    def _spawn(self, coroutine, loop: asyncio.AbstractEventLoop):
+        """Run a coroutine in the background, keeping a reference until it finishes"""
+        task = loop.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def ping_idle(self, interval: float) -> int:
+        """Ping every socket silent for `interval` seconds (once); returns how many"""
+        now = time.monotonic()
+        frame = Frame({"type": "ping", "timestamp": time.time()})
+        idle = [
+            socket_id for socket_id, seen in self.last_seen.items()
+            if seen <= now - interval and socket_id not in self.pings
+        ]
+        for socket_id in idle:
+            self.pings[socket_id] = now
+            self.enqueue(frame, socket_id)
+        return len(idle)
+
+    async def reap(self, timeout: float) -> int:
+        """Evict sockets that left a ping unanswered for `timeout` seconds"""
+        cutoff = time.monotonic() - timeout
+        dead = [socket_id for socket_id, sent in list(self.pings.items()) if sent <= cutoff]
+        for socket_id in dead:
+            # 1001 "going away": most likely the peer is gone (half-open TCP)
+            await self.evict(socket_id, "idle", code=1001)
+        self.last_reaped = len(dead)
+        return len(dead)
+
+    async def keep_alive(self, interval: float, timeout: float):
+        """
+        Ping silent sockets that opted in to heartbeats and reap the ones
+        that do not answer. Other sockets are left to the server's
+        protocol-level WebSocket pings (uvicorn --ws-ping-interval), which
+        close half-open connections without any client code.
+        """
+        while True:
+            await asyncio.sleep(min(interval, timeout))
+            try:
+                reaped = await self.reap(timeout)
+                if reaped:
+                    logger.info(f"Reaped {reaped} unresponsive sockets, {len(self.active_connections)} remain")
+                self.ping_idle(interval)
+            except Exception as e:
+                logger.error(f"Socket keep-alive failed: {str(e)}")
+
     async def send_personal_message(self, message: dict, socket_id: str):
-        """Send a message to a specific socket"""
-        if socket_id in self.active_connections:
-            websocket = self.active_connections[socket_id]
-            await websocket.send_text(json.dumps(message))
+        """Send a message to a specific socket (queued; returns once enqueued)"""
+        return self.enqueue(message, socket_id)
+
+    def queue_stats(self) -> Dict:
+        """Send queue depths across this worker's sockets"""
+        outboxes = list(self.outboxes.values())
+        depths = [outbox.depth for outbox in outboxes]
+        now = time.monotonic()
+        return {
+            "connections": len(outboxes),
+            "queue_size": Config.SOCKET_SEND_QUEUE_SIZE,
+            "send_timeout_seconds": Config.SOCKET_SEND_TIMEOUT_SECONDS,
+            "queued": sum(depths),
+            "max_depth": max(depths, default=0),
+            "sending_longest_seconds": max(
+                (now - outbox.sending_since for outbox in outboxes if outbox.sending_since is not None), default=0.0
+            ),
+            "last_reaped": self.last_reaped,
+            "replay_users": len(self.replay),
+            "evictions": {
+                reason: websocket_evictions_total.value(reason=reason)
+                for reason in ("queue_full", "send_timeout", "send_error", "idle")
+            },
+        }
 
     async def broadcast_to_user(self, user_id: int, message: dict):
-        """Send a message to all connections of a user"""
+        """
+        Send a message to all connections of a user, on every worker.
+        Falls back to this worker's sockets if the backplane is unavailable.
+        """
+        if not self.backplane.started:
+            # Before startup (or without a lifespan, e.g. in tests) only local sockets exist
+            return await self.deliver_to_user(user_id, message)
+        try:
+            await self.backplane.publish(user_id, message)
+            return True
+        except Exception as e:
+            logger.error(f"Backplane publish failed, delivering locally only: {str(e)}")
+            return await self.deliver_to_user(user_id, message)
+
+    def schedule_broadcast(self, user_id: int, message: dict):
+        """
+        Start broadcast_to_user without waiting for it. Works from the event
+        loop and from sync routes running in the threadpool.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            self._spawn(self.broadcast_to_user(user_id, message), loop)
+        elif self.loop is not None and self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.broadcast_to_user(user_id, message), self.loop)
+        else:
+            logger.warning(f"No running event loop; message for user {user_id} not sent")
+
+    async def deliver_to_user(self, user_id: int, message: dict):
+        """Send a message to this worker's connections of a user"""
+        # Stamped with the user's next sequence number and kept for replay,
+        # also while the user is briefly disconnected
+        frame = self.replay.record(user_id, message, track=user_id in self.user_connections)
         if user_id in self.user_connections:
             sockets = self.user_connections[user_id]
             logger.info(f"Broadcasting to user {user_id} with {len(sockets)} active connections")
             success_count = 0
             
-            for socket_id in sockets:
-                try:
-                    await self.send_personal_message(message, socket_id)
+            # Only enqueues: each socket's writer task does the sending, so a
+            # stalled client cannot hold up the others. The sockets share one
+            # Frame, so the message is serialized once per encoding in use.
+            for socket_id in list(sockets):
+                if self.enqueue(frame, socket_id):
                     success_count += 1
-                except Exception as e:
-                    logger.error(f"Failed to send message to socket {socket_id}: {str(e)}")
                     
-            logger.info(f"Successfully sent message to {success_count}/{len(sockets)} connections for user {user_id}")
+            logger.info(f"Queued message to {success_count}/{len(sockets)} connections for user {user_id}")
+            notification_broadcasts_total.inc(result="delivered" if success_count > 0 else "failed")
             return success_count > 0
         
         logger.warning(f"No active connections found for user {user_id}")
+        notification_broadcasts_total.inc(result="no_connections")
         return False
 
 # Global socket manager instance
@@ -97,7 +302,19 @@ except Exception as e:
     logger.error(f"Failed to initialize socket manager: {str(e)}", exc_info=True)
     # Fallback to a dummy socket manager to prevent crashes
     class DummySocketManager:
+        async def start(self):
+            pass
+
+        async def stop(self):
+            pass
+
+        async def keep_alive(self, interval, timeout):
+            pass
+
         async def broadcast_to_user(self, user_id, message):
             logger.warning(f"Using dummy socket manager. Message for user {user_id} not sent.")
             return False
+
+        def schedule_broadcast(self, user_id, message):
+            logger.warning(f"Using dummy socket manager. Message for user {user_id} not sent.")
     socket_manager = DummySocketManager()
@@ -2,11 +2,16 @@ from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+import logging
 from app.core.config import Config
+from app.database import async_session
 from app.models.user import User
 from app.dependencies.db import get_db
 
+logger = logging.getLogger(__name__)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
 SECRET_KEY = Config.JWT_SECRET
@@ -42,13 +47,14 @@ async def verify_token_ws(token: str):
             token = token[7:]
             
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+        user_id: str = payload.get("sub")
+        if user_id is None:
             return None
             
         # Get user from database asynchronously
+        # (tokens carry the user id as "sub", see create_access_token callers)
         async with async_session() as session:
-            result = await session.execute(select(User).filter(User.email == username))
+            result = await session.execute(select(User).filter(User.id == int(user_id)))
             user = result.scalars().first()
             if user is None:
                 return None
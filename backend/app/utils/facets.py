@@ -0,0 +1,86 @@
+# app/utils/facets.py
+from typing import Dict, List
+
+from fastapi import HTTPException
+from sqlalchemy import String, case, cast, func, literal, select, tuple_, union_all
+from sqlalchemy.orm import Query, Session
+
+from app.models.listing import Listing
+
+LISTING_FACETS = ("service", "price", "location")
+# Lower edges of the min_price histogram buckets; the last bucket is open-ended
+PRICE_BUCKET_EDGES = [0, 50, 100, 250, 500, 1000]
+TOP_LOCATIONS = 10
+
+
+def parse_facets(facets: str) -> List[str]:
+    """'service,price' -> ['service', 'price'] ('all' selects every facet)"""
+    names = [name.strip() for name in facets.split(",") if name.strip()]
+    if names == ["all"]:
+        return list(LISTING_FACETS)
+    unknown = [name for name in names if name not in LISTING_FACETS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown facets: {', '.join(unknown)}")
+    return names
+
+
+def _price_bucket(price):
+    """Index of the PRICE_BUCKET_EDGES bucket containing `price` (NULL if unpriced)"""
+    whens = [(price >= edge, index) for index, edge in reversed(list(enumerate(PRICE_BUCKET_EDGES)))]
+    return case(*whens, else_=None)
+
+
+def _bucket_label(index: int) -> Dict:
+    low = PRICE_BUCKET_EDGES[index]
+    high = PRICE_BUCKET_EDGES[index + 1] if index + 1 < len(PRICE_BUCKET_EDGES) else None
+    return {"min": low, "max": high, "label": f"{low}-{high}" if high is not None else f"{low}+"}
+
+
+def listing_facets(query: Query, db: Session, names: List[str]) -> Dict:
+    """
+    Facet counts over every listing matched by `query` (not just one page),
+    fetched in a single statement: GROUPING SETS on PostgreSQL, an
+    equivalent UNION ALL of GROUP BYs elsewhere.
+    """
+    base = query.with_entities(
+        Listing.service_id.label("service"),
+        _price_bucket(Listing.min_price).label("price"),
+        func.lower(func.trim(Listing.location)).label("location"),
+    ).order_by(None).subquery()
+    columns = [base.c[name] for name in names]
+
+    if db.get_bind().dialect.name == "postgresql":
+        # GROUPING(col) is 0 for the set grouped by col, so it tells the
+        # sets apart even when the grouped value itself is NULL
+        facet = case(*[(func.grouping(column) == 0, name) for name, column in zip(names, columns)])
+        value = func.coalesce(*[cast(column, String) for column in columns])
+        statement = (
+            select(facet, value, func.count())
+            .group_by(func.grouping_sets(*[tuple_(column) for column in columns]))
+        )
+        rows = db.execute(statement).all()
+    else:
+        statement = union_all(*[
+            select(literal(name), cast(column, String), func.count()).group_by(column)
+            for name, column in zip(names, columns)
+        ])
+        rows = db.execute(statement).all()
+
+    result = {name: [] for name in names}
+    for name, value, count in rows:
+        if value is None or value == "":
+            continue
+        if name == "service":
+            result[name].append({"value": int(value), "count": count})
+        elif name == "price":
+            result[name].append({**_bucket_label(int(value)), "count": count})
+        else:
+            result[name].append({"value": value, "count": count})
+
+    if "service" in result:
+        result["service"].sort(key=lambda item: (-item["count"], item["value"]))
+    if "price" in result:
+        result["price"].sort(key=lambda item: item["min"])
+    if "location" in result:
+        result["location"] = sorted(result["location"], key=lambda item: (-item["count"], item["value"]))[:TOP_LOCATIONS]
+    return result
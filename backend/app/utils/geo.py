@@ -0,0 +1,225 @@
+# app/utils/geo.py
+import csv
+import logging
+import math
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, event, or_
+
+from app.core.config import Config
+from app.models.listing import Listing
+
+logger = logging.getLogger(__name__)
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Stored precision (~5 m cells); searches use shorter prefixes
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        # Bits alternate longitude/latitude, starting with longitude
+        target, rng = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if target >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def cell_size_degrees(precision: int) -> Tuple[float, float]:
+    """(height, width) in degrees of a geohash cell"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def covering_prefixes(latitude: float, longitude: float, radius_km: float) -> List[str]:
+    """
+    Geohash prefixes whose cells cover the circle: the center cell and its
+    eight neighbours, at the finest precision whose cells are at least
+    radius_km across. Empty when the radius is too large to narrow anything.
+    """
+    cos_lat = max(math.cos(math.radians(latitude)), 0.01)
+    precision = 0
+    for candidate in range(1, GEOHASH_PRECISION + 1):
+        height, width = cell_size_degrees(candidate)
+        if height * KM_PER_DEGREE < radius_km or width * KM_PER_DEGREE * cos_lat < radius_km:
+            break
+        precision = candidate
+    if precision == 0:
+        return []
+
+    height, width = cell_size_degrees(precision)
+    prefixes = set()
+    for dlat in (-height, 0.0, height):
+        for dlon in (-width, 0.0, width):
+            lat = min(max(latitude + dlat, -90.0), 90.0)
+            lon = longitude_delta(longitude + dlon)
+            prefixes.add(geohash_encode(lat, lon, precision))
+    return sorted(prefixes)
+
+
+def longitude_delta(delta):
+    """
+    Wrap a longitude difference into [-180, 180], so points on either side
+    of the antimeridian are close. Works on floats and SQL expressions
+    (arithmetic only, as % is integer-only in SQLite).
+    """
+    if isinstance(delta, (int, float)):
+        return (delta + 180.0) % 360.0 - 180.0
+    return case((delta > 180.0, delta - 360.0), (delta < -180.0, delta + 360.0), else_=delta)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def parse_point(value: str) -> Tuple[float, float]:
+    """'36.75,3.06' -> (36.75, 3.06)"""
+    try:
+        latitude, longitude = (float(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError("expected 'lat,lon'")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("coordinates out of range")
+    return latitude, longitude
+
+
+def apply_radius_search(query, latitude: float, longitude: float, radius_km: float):
+    """
+    Restrict a Listing query to listings within radius_km of the point,
+    nearest first.
+    Geohash prefix ranges narrow the scan through ix_listings_geohash; the
+    distance itself uses an equirectangular approximation, which needs only
+    arithmetic (no trig functions in SQLite) and is accurate to well under
+    1% at city-scale radii.
+    """
+    prefixes = covering_prefixes(latitude, longitude, radius_km)
+    if prefixes:
+        # "{" sorts right after "z", the last geohash character
+        query = query.filter(or_(*[
+            and_(Listing.geohash >= prefix, Listing.geohash < prefix + "{") for prefix in prefixes
+        ]))
+    else:
+        query = query.filter(Listing.geohash.isnot(None))
+
+    lon_scale = math.cos(math.radians(latitude))
+    dy = (Listing.latitude - latitude) * KM_PER_DEGREE
+    dx = longitude_delta(Listing.longitude - longitude) * (KM_PER_DEGREE * lon_scale)
+    distance_squared = dy * dy + dx * dx
+    return query.filter(distance_squared <= radius_km * radius_km).order_by(distance_squared, Listing.id)
+
+
+def _set_geohash(mapper, connection, target):
+    if target.latitude is not None and target.longitude is not None:
+        target.geohash = geohash_encode(target.latitude, target.longitude)
+    else:
+        target.geohash = None
+
+
+event.listen(Listing, "before_insert", _set_geohash)
+event.listen(Listing, "before_update", _set_geohash)
+
+
+def _normalize_place(name: str) -> str:
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    return " ".join(name.lower().replace("-", " ").split())
+
+
+class Gazetteer:
+    """
+    Place name -> (latitude, longitude) lookups from a local file, for
+    geocoding free-text locations without a network service.
+    Accepts a CSV with a name,latitude,longitude[,population] header, or a
+    GeoNames dump (tab separated .txt, e.g. cities1000.txt) whose
+    alternate names are indexed too. On duplicate names the most populous
+    place wins.
+    """
+    def __init__(self):
+        self._places: Dict[str, Tuple[float, float, int]] = {}
+
+    def __len__(self):
+        return len(self._places)
+
+    def add(self, name: str, latitude: float, longitude: float, population: int = 0):
+        key = _normalize_place(name)
+        if key and (key not in self._places or population > self._places[key][2]):
+            self._places[key] = (latitude, longitude, population)
+
+    @classmethod
+    def load(cls, path: str) -> "Gazetteer":
+        gazetteer = cls()
+        with open(path, encoding="utf-8", newline="") as handle:
+            if path.endswith(".txt"):
+                for row in csv.reader(handle, delimiter="\t", quoting=csv.QUOTE_NONE):
+                    latitude, longitude = float(row[4]), float(row[5])
+                    population = int(row[14] or 0)
+                    for name in [row[1], row[2], *row[3].split(",")]:
+                        gazetteer.add(name, latitude, longitude, population)
+            else:
+                for row in csv.DictReader(handle):
+                    gazetteer.add(row["name"], float(row["latitude"]), float(row["longitude"]),
+                                  int(row.get("population") or 0))
+        return gazetteer
+
+    def lookup(self, location: Optional[str]) -> Optional[Tuple[float, float]]:
+        """
+        Coordinates for a free-text location: the whole string first, then
+        each comma-separated part ("Bab Ezzouar, Algiers").
+        """
+        if not location:
+            return None
+        for candidate in [location, *location.split(",")]:
+            place = self._places.get(_normalize_place(candidate))
+            if place:
+                return place[0], place[1]
+        return None
+
+
+_gazetteer: Optional[Gazetteer] = None
+# Set once loading was attempted, so a missing or unreadable file is
+# reported once instead of retried on every listing write
+_gazetteer_loaded = False
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """The GAZETTEER_PATH gazetteer, loaded on first use (None if not configured or unreadable)"""
+    global _gazetteer, _gazetteer_loaded
+    if not _gazetteer_loaded and Config.GAZETTEER_PATH:
+        _gazetteer_loaded = True
+        try:
+            _gazetteer = Gazetteer.load(Config.GAZETTEER_PATH)
+            logger.info(f"Loaded {len(_gazetteer)} places from {Config.GAZETTEER_PATH}")
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            logger.error(f"Could not load gazetteer {Config.GAZETTEER_PATH}: {e}")
+    return _gazetteer
+
+
+def geocode_listing(listing: Listing) -> bool:
+    """Fill in missing coordinates from the listing's location text; True if found"""
+    if listing.latitude is not None and listing.longitude is not None:
+        return False
+    gazetteer = get_gazetteer()
+    coordinates = gazetteer.lookup(listing.location) if gazetteer else None
+    if coordinates is None:
+        return False
+    listing.latitude, listing.longitude = coordinates
+    return True
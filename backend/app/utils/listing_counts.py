@@ -0,0 +1,132 @@
+# app/utils/listing_counts.py
+import json
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Query, Session, object_session
+
+from app.core.config import Config
+from app.models.listing import Listing
+from app.utils.search import keyword_tokens
+
+CountKey = Tuple[Tuple[str, Any], ...]
+
+
+class ListingCountCache:
+    """
+    Short-lived totals for listing searches, keyed by the normalized filter
+    set so every page of the same search shares one count. Any committed
+    listing write clears the cache; the TTL bounds staleness from other
+    processes.
+    """
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[CountKey, Tuple[float, int, bool]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: CountKey) -> Optional[Tuple[int, bool]]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl_seconds:
+            return None
+        return entry[1], entry[2]
+
+    def set(self, key: CountKey, total: int, estimated: bool):
+        with self._lock:
+            # Drop expired entries opportunistically to keep the map bounded
+            if len(self._entries) > 10000:
+                cutoff = time.monotonic() - self.ttl_seconds
+                self._entries = {k: e for k, e in self._entries.items() if e[0] >= cutoff}
+            self._entries[key] = (time.monotonic(), total, estimated)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+
+listing_counts = ListingCountCache(Config.LISTING_COUNT_CACHE_TTL)
+
+
+# Session.info flag: the transaction wrote listings
+_STALE = "listing_counts_stale"
+
+
+def invalidate_listing_counts(db: Session):
+    """
+    Clear the cache once `db` commits. Flushed ORM writes are caught by the
+    mapper events below; bulk update()/delete() statements on listings must
+    call this themselves.
+    """
+    db.info[_STALE] = True
+
+
+def _mark_stale(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        invalidate_listing_counts(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    # Clearing at flush time would let a concurrent reader cache the
+    # pre-commit count again before the write becomes visible
+    if session.info.pop(_STALE, False):
+        listing_counts.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop(_STALE, None)
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Listing, _event, _mark_stale)
+
+
+def count_key(**filters) -> CountKey:
+    """Normalize filters so equivalent searches share a cache entry"""
+    normalized = {}
+    for name, value in filters.items():
+        if value is None or value == "":
+            continue
+        if name == "keyword":
+            value = " ".join(keyword_tokens(value))
+        elif isinstance(value, str):
+            value = value.strip().lower()
+        normalized[name] = value
+    return tuple(sorted(normalized.items()))
+
+
+def estimate_rows(query: Query, db: Session) -> Optional[int]:
+    """The PostgreSQL planner's row estimate for a query (None elsewhere)"""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    statement = query.with_entities(Listing.id).order_by(None).statement
+    compiled = statement.compile(dialect=bind.dialect, compile_kwargs={"render_postcompile": True})
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_listings(query: Query, db: Session, **filters) -> Tuple[int, bool]:
+    """
+    Total for a filtered listing query and whether it is an estimate.
+    Served from the cache when possible; otherwise large result sets use
+    the planner estimate and only small ones pay for an exact COUNT(*).
+    """
+    key = count_key(**filters)
+    cached = listing_counts.get(key)
+    if cached is not None:
+        return cached
+
+    estimate = estimate_rows(query, db)
+    if estimate is not None and estimate > Config.LISTING_COUNT_ESTIMATE_THRESHOLD:
+        total, estimated = estimate, True
+    else:
+        total, estimated = query.order_by(None).count(), False
+    listing_counts.set(key, total, estimated)
+    return total, estimated
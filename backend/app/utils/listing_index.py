@@ -0,0 +1,377 @@
+# app/utils/listing_index.py
+"""
+In-process listing search index (LISTING_SEARCH_BACKEND=memory).
+
+Each worker holds its own copy, so the admin check/rebuild endpoints only
+reach the worker that served the request. To check an index built from
+the database outside the workers:
+
+    cd backend && python -m app.utils.listing_index --check
+    cd backend && python -m app.utils.listing_index --check --keyword plumb --keyword "roof rep"
+
+--check builds the index the way a worker does at startup, verifies that a
+resync against the database finds nothing to repair, and that each
+--keyword search finds every listing the SQL search finds. It exits
+non-zero on any difference.
+Running workers pick up database changes at their next resync
+(LISTING_INDEX_SYNC_SECONDS) or on restart.
+"""
+import argparse
+import asyncio
+import bisect
+import logging
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.database import ReplicaSessionLocal
+from app.models.listing import Listing
+from app.models.service import Service
+from app.utils.search import apply_keyword_search, keyword_tokens
+
+logger = logging.getLogger(__name__)
+
+# Listing attributes kept per document: the ListingOut fields
+DOCUMENT_FIELDS = (
+    "id", "title", "description", "min_price", "max_price", "location", "latitude", "longitude",
+    "available", "service_id", "user_id", "created_at", "provider_rating", "provider_review_count",
+)
+# Weight of a term by the field it came from (a term keeps its best field)
+FIELD_WEIGHTS = {"title": 3.0, "service": 2.0, "location": 1.0, "description": 1.0}
+# Score multipliers by how a query word matched a term
+EXACT, PREFIX, FUZZY = 1.0, 0.8, 0.5
+# Words shorter than this only match exactly or as prefixes
+FUZZY_MIN_LENGTH = 4
+
+
+def _deletes(term: str) -> Set[str]:
+    """Every string one deletion away from `term`"""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def listing_document(listing: Listing, service_name: Optional[str]) -> Dict:
+    document = {field: getattr(listing, field) for field in DOCUMENT_FIELDS}
+    document["service_name"] = service_name
+    return document
+
+
+class ListingIndex:
+    """
+    In-process inverted index over listing title, description, location
+    and service name, answering /listings/ searches without the database.
+
+    Query words must all match (like the SQL search); a word matches a
+    term exactly, as a prefix (every word, like the prefix tsquery) or
+    within one edit (typos, via a deletion-neighbourhood map).
+
+    The index is per process. It is kept current by the listing routes and
+    resynced from the database periodically, so other workers' writes show
+    up within one sync interval.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+        self.ready = False
+        self.synced_at: Optional[float] = None
+
+    def _reset(self):
+        self._documents: Dict[int, Dict] = {}
+        self._doc_terms: Dict[int, Dict[str, float]] = {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._delete_map: Dict[str, Set[str]] = {}
+        self._vocabulary: List[str] = []
+
+    def __len__(self):
+        return len(self._documents)
+
+    # Writes
+
+    def _add_term(self, term: str, listing_id: int, weight: float):
+        postings = self._postings.get(term)
+        if postings is None:
+            postings = self._postings[term] = {}
+            bisect.insort(self._vocabulary, term)
+            for variant in _deletes(term):
+                self._delete_map.setdefault(variant, set()).add(term)
+        postings[listing_id] = weight
+
+    def _remove_term(self, term: str, listing_id: int):
+        postings = self._postings.get(term)
+        if postings is None:
+            return
+        postings.pop(listing_id, None)
+        if not postings:
+            del self._postings[term]
+            position = bisect.bisect_left(self._vocabulary, term)
+            if position < len(self._vocabulary) and self._vocabulary[position] == term:
+                self._vocabulary.pop(position)
+            for variant in _deletes(term):
+                terms = self._delete_map.get(variant)
+                if terms is not None:
+                    terms.discard(term)
+                    if not terms:
+                        del self._delete_map[variant]
+
+    def upsert(self, document: Dict):
+        terms: Dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            text = document.get("service_name" if field == "service" else field)
+            for term in keyword_tokens(text or ""):
+                terms[term] = max(terms.get(term, 0.0), weight)
+        with self._lock:
+            self.remove(document["id"])
+            self._documents[document["id"]] = document
+            self._doc_terms[document["id"]] = terms
+            for term, weight in terms.items():
+                self._add_term(term, document["id"], weight)
+
+    def remove(self, listing_id: int):
+        with self._lock:
+            self._documents.pop(listing_id, None)
+            for term in self._doc_terms.pop(listing_id, {}):
+                self._remove_term(term, listing_id)
+
+    def upsert_listing(self, listing: Listing, service_name: Optional[str] = None):
+        """Index a listing after it was written (no-op until the index is built)"""
+        if not self.ready:
+            return
+        if service_name is None and listing.service is not None:
+            service_name = listing.service.name
+        self.upsert(listing_document(listing, service_name))
+
+    def remove_listing(self, listing_id: int):
+        if self.ready:
+            self.remove(listing_id)
+
+    def remove_user_listings(self, user_id: int):
+        self._remove_where("user_id", user_id)
+
+    def remove_service_listings(self, service_id: int):
+        self._remove_where("service_id", service_id)
+
+    def _remove_where(self, field: str, value: int):
+        if not self.ready:
+            return
+        with self._lock:
+            for listing_id in [i for i, d in self._documents.items() if d[field] == value]:
+                self.remove(listing_id)
+
+    def refresh(self, db: Session, *where) -> int:
+        """
+        Re-index the listings matching `where` from the database, after a
+        committed bulk UPDATE (which the per-listing hooks above never see).
+        """
+        if not self.ready:
+            return 0
+        documents = self.load_documents(db, *where)
+        for document in documents.values():
+            self.upsert(document)
+        return len(documents)
+
+    def refresh_user_listings(self, db: Session, user_id: int) -> int:
+        return self.refresh(db, Listing.user_id == user_id)
+
+    # Database sync
+
+    @staticmethod
+    def load_documents(db: Session, *where) -> Dict[int, Dict]:
+        """Every listing (or those matching `where`) as an index document, in one query"""
+        rows = db.query(Listing, Service.name).outerjoin(Service, Service.id == Listing.service_id).filter(*where).all()
+        return {listing.id: listing_document(listing, service_name) for listing, service_name in rows}
+
+    def check(self, documents: Dict[int, Dict]) -> Dict[str, List[int]]:
+        """Differences between the index and `documents` (from load_documents)"""
+        with self._lock:
+            indexed = self._documents
+            return {
+                "missing": sorted(i for i in documents if i not in indexed),
+                "stale": sorted(i for i, d in documents.items() if i in indexed and indexed[i] != d),
+                "extra": sorted(i for i in indexed if i not in documents),
+            }
+
+    def sync(self, db: Session) -> Dict[str, List[int]]:
+        """Repair every difference from the database; returns what was repaired"""
+        documents = self.load_documents(db)
+        differences = self.check(documents)
+        with self._lock:
+            for listing_id in differences["extra"]:
+                self.remove(listing_id)
+            for listing_id in differences["missing"] + differences["stale"]:
+                self.upsert(documents[listing_id])
+            self.ready = True
+            self.synced_at = time.time()
+        return differences
+
+    def rebuild(self, db: Session) -> int:
+        """Build a fresh index from the database and swap it in"""
+        fresh = ListingIndex()
+        for document in self.load_documents(db).values():
+            fresh.upsert(document)
+        with self._lock:
+            self._documents, self._doc_terms = fresh._documents, fresh._doc_terms
+            self._postings, self._delete_map = fresh._postings, fresh._delete_map
+            self._vocabulary = fresh._vocabulary
+            self.ready = True
+            self.synced_at = time.time()
+        return len(self._documents)
+
+    # Search
+
+    def _expand(self, word: str) -> Dict[str, float]:
+        """Index terms matching a query word, with their match multipliers"""
+        matches: Dict[str, float] = {}
+        if len(word) >= FUZZY_MIN_LENGTH:
+            # Terms one edit away share a deletion variant with the word
+            candidates: Set[str] = set(self._delete_map.get(word, ()))
+            for variant in _deletes(word):
+                candidates.update(self._delete_map.get(variant, ()))
+                if variant in self._postings:
+                    candidates.add(variant)
+            for term in candidates:
+                matches[term] = FUZZY
+        # Every term starting with the word sorts between these two
+        start = bisect.bisect_left(self._vocabulary, word)
+        end = bisect.bisect_left(self._vocabulary, word + "\uffff", start)
+        for term in self._vocabulary[start:end]:
+            matches[term] = max(matches.get(term, 0.0), PREFIX)
+        if word in self._postings:
+            matches[word] = EXACT
+        return matches
+
+    def _keyword_scores(self, words: List[str]) -> Dict[int, float]:
+        scores: Optional[Dict[int, float]] = None
+        for word in words:
+            word_scores: Dict[int, float] = {}
+            for term, factor in self._expand(word).items():
+                for listing_id, weight in self._postings[term].items():
+                    if scores is None or listing_id in scores:
+                        word_scores[listing_id] = max(word_scores.get(listing_id, 0.0), weight * factor)
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {i: scores[i] + s for i, s in word_scores.items()}
+            if not scores:
+                break
+        return scores or {}
+
+    def search(
+        self,
+        keyword: Optional[str] = None,
+        service_id: Optional[int] = None,
+        location: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        sort: Optional[str] = None,
+        page: int = 1,
+        limit: int = 10,
+    ) -> Tuple[List[Dict], int]:
+        """The same filters and sorts as get_listings; returns (page, total)"""
+        words = keyword_tokens(keyword or "")
+        location = location.lower() if location else None
+        with self._lock:
+            scores = self._keyword_scores(words) if words else None
+            candidates: Iterable[Dict] = (
+                (self._documents[i] for i in scores) if scores is not None else self._documents.values()
+            )
+            matches = [
+                d for d in candidates
+                if d["available"]
+                and (not service_id or d["service_id"] == service_id)
+                and (not location or location in (d["location"] or "").lower())
+                and (min_price is None or (d["min_price"] is not None and d["min_price"] >= min_price))
+                and (max_price is None or (d["max_price"] is not None and d["max_price"] <= max_price))
+                and (min_rating is None or d["provider_rating"] >= min_rating)
+            ]
+
+        if sort == "newest":
+            matches.sort(key=lambda d: d["id"], reverse=True)
+        elif sort == "price":
+            matches.sort(key=lambda d: (d["min_price"] is None, d["min_price"] or 0.0, d["id"]))
+        elif sort == "rating":
+            matches.sort(key=lambda d: (d["provider_rating"], d["id"]), reverse=True)
+        elif scores is not None:
+            matches.sort(key=lambda d: (scores[d["id"]], d["id"]), reverse=True)
+        else:
+            matches.sort(key=lambda d: d["id"])
+        start = (page - 1) * limit
+        return matches[start:start + limit], len(matches)
+
+
+listing_index = ListingIndex()
+
+
+def _sync_from_database(rebuild: bool = False) -> Dict[str, List[int]]:
+    db = ReplicaSessionLocal()
+    try:
+        if rebuild:
+            return {"indexed": listing_index.rebuild(db)}
+        return listing_index.sync(db)
+    finally:
+        db.close()
+
+
+async def keep_listing_index_synced(interval_seconds: float):
+    """Build the index, then resync it from the database every interval"""
+    rebuild = True
+    while True:
+        try:
+            started = time.perf_counter()
+            result = await asyncio.to_thread(_sync_from_database, rebuild)
+            elapsed = time.perf_counter() - started
+            if rebuild:
+                logger.info(f"Built listing index with {result['indexed']} listings in {elapsed:.2f}s")
+                rebuild = False
+            elif any(result.values()):
+                logger.info(f"Listing index resync repaired {', '.join(f'{len(v)} {k}' for k, v in result.items())}")
+        except Exception as e:
+            logger.error(f"Listing index sync failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+def _check(db: Session, keywords: List[str]) -> bool:
+    index = ListingIndex()
+    started = time.perf_counter()
+    indexed = index.rebuild(db)
+    print(f"Built index with {indexed} listings and {len(index._vocabulary)} terms "
+          f"in {time.perf_counter() - started:.2f}s")
+    consistent = True
+    differences = index.sync(db)
+    if any(differences.values()):
+        consistent = False
+        print(f"MISMATCH  resync repaired {', '.join(f'{len(v)} {k}' for k, v in differences.items())}")
+    for keyword in keywords:
+        memory, _ = index.search(keyword=keyword, limit=indexed or 1)
+        query = apply_keyword_search(db.query(Listing.id).filter(Listing.available == True), db, keyword, order=False)
+        memory_ids = {d["id"] for d in memory}
+        # The index also matches typos, service names and locations, so it
+        # may find more than SQL; it must not miss anything SQL finds
+        missed = sorted({listing_id for (listing_id,) in query} - memory_ids)
+        consistent = consistent and not missed
+        print(f"{'MISMATCH' if missed else 'ok      '}  {keyword!r}: memory={len(memory_ids)}"
+              f"{f'  missing={missed}' if missed else ''}")
+    return consistent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="build an index from the database and check it")
+    parser.add_argument("--keyword", action="append", default=[], help="search to compare with the SQL search")
+    args = parser.parse_args()
+    if not args.check:
+        parser.error("nothing to do (pass --check)")
+
+    db = ReplicaSessionLocal()
+    try:
+        consistent = _check(db, args.keyword)
+    finally:
+        db.close()
+    print("OK: the index matches the database" if consistent else "FAILED: the index differs from the database")
+    sys.exit(0 if consistent else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# app/utils/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+from app.models.listing import Listing
+
+# Keyset sort orders for listing search: name -> (sort column, descending).
+# Listing.id is always the tie-breaker, in the same direction as the sort
+# column. "newest" sorts by id alone: ids are assigned in creation order and,
+# unlike created_at, are never NULL.
+LISTING_SORTS = {
+    "newest": (None, True),
+    "price": (Listing.min_price, False),
+    "rating": (Listing.provider_rating, True),
+}
+LISTING_SORT_PATTERN = "^(" + "|".join(LISTING_SORTS) + ")$"
+
+
+def encode_cursor(sort: str, values: List[Any]) -> str:
+    raw = json.dumps({"s": sort, "v": values}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _cursor_value(value: Any) -> Any:
+    """A sort key from a cursor: a number, or an ISO datetime string"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    raise ValueError("cursor values must be numbers or ISO datetimes")
+
+
+def decode_cursor(cursor: str, sort: str) -> Optional[List[Any]]:
+    """
+    Position encoded in a cursor, or None for an empty cursor (first page).
+    The position must have one value per sort key (the sort column, if any,
+    then the id); anything else is a 400.
+    """
+    if not cursor:
+        return None
+    column, _ = LISTING_SORTS[sort]
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(data, dict):
+            raise ValueError("cursor is not an object")
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if data.get("s") != sort:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different sort order")
+    try:
+        values = data["v"]
+        if not isinstance(values, list) or len(values) != (1 if column is None else 2):
+            raise ValueError("wrong number of cursor values")
+        values = [_cursor_value(value) for value in values]
+        if not isinstance(values[-1], int):
+            raise ValueError("the last cursor value is a listing id")
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def order_listings(query: Query, sort: str) -> Query:
+    """Apply a LISTING_SORTS order"""
+    column, descending = LISTING_SORTS[sort]
+    keys = ([column] if column is not None else []) + [Listing.id]
+    return query.order_by(*[key.desc() if descending else key.asc() for key in keys])
+
+
+def paginate_listings_by_cursor(query: Query, sort: str, cursor: Optional[str], limit: int) -> Tuple[list, Optional[str]]:
+    """
+    Seek to the position after `cursor` instead of OFFSET, so every page
+    costs the same. Returns the page and the cursor for the next page
+    (None on the last page).
+    """
+    column, descending = LISTING_SORTS[sort]
+    position = decode_cursor(cursor, sort)
+    query = order_listings(query, sort)
+
+    if position is not None:
+        if column is None:
+            last_id = position[0]
+            query = query.filter(Listing.id < last_id if descending else Listing.id > last_id)
+        else:
+            keys, values = tuple_(column, Listing.id), tuple_(*position)
+            query = query.filter(keys < values if descending else keys > values)
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        if column is None:
+            next_cursor = encode_cursor(sort, [last.id])
+        else:
+            next_cursor = encode_cursor(sort, [getattr(last, column.key), last.id])
+    return items, next_cursor
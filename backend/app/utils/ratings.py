@@ -0,0 +1,74 @@
+# app/utils/ratings.py
+from sqlalchemy import case, func, select, update, literal
+from sqlalchemy.orm import Session
+
+from app.models.listing import Listing
+from app.models.profile import Profile
+from app.models.review import Review
+from app.utils.listing_counts import invalidate_listing_counts
+
+
+def _average(count_expr, sum_expr):
+    """average_rating expression for the given count/sum (0.0 with no reviews)"""
+    return case((count_expr > 0, sum_expr * literal(1.0) / count_expr), else_=literal(0.0))
+
+
+def _copy_to_listings(db: Session, *where):
+    """Copy profile ratings onto the matching listings' provider_rating/provider_review_count"""
+    profile = select(Profile).where(Profile.user_id == Listing.user_id)
+    db.execute(
+        update(Listing)
+        .where(*where)
+        .values(
+            provider_rating=func.coalesce(profile.with_only_columns(Profile.average_rating).scalar_subquery(), 0.0),
+            provider_review_count=func.coalesce(profile.with_only_columns(Profile.rating_count).scalar_subquery(), 0),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    # Bulk updates skip the mapper events; min_rating totals depend on these
+    invalidate_listing_counts(db)
+
+
+def apply_rating_change(db: Session, user_id: int, count_delta: int, sum_delta: int):
+    """
+    Adjust a user's rating totals in the current transaction and copy them
+    onto the user's listings.
+    The increment happens inside one UPDATE, so concurrent reviews cannot
+    lose each other's changes. The caller commits.
+    """
+    if user_id is None:
+        return
+    new_count = Profile.rating_count + count_delta
+    new_sum = Profile.rating_sum + sum_delta
+    db.execute(
+        update(Profile)
+        .where(Profile.user_id == user_id)
+        .values(rating_count=new_count, rating_sum=new_sum, average_rating=_average(new_count, new_sum))
+        .execution_options(synchronize_session=False)
+    )
+    _copy_to_listings(db, Listing.user_id == user_id)
+
+
+def reconcile_ratings(db: Session) -> int:
+    """
+    Recompute every profile's rating totals from the reviews table in one
+    set-based UPDATE, then refresh every listing's copy of them.
+    Returns the number of profiles updated. The caller commits.
+    """
+    review_count = (
+        select(func.count(Review.id))
+        .where(Review.reviewee_id == Profile.user_id)
+        .scalar_subquery()
+    )
+    review_sum = (
+        select(func.coalesce(func.sum(Review.rating), 0))
+        .where(Review.reviewee_id == Profile.user_id)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(Profile)
+        .values(rating_count=review_count, rating_sum=review_sum, average_rating=_average(review_count, review_sum))
+        .execution_options(synchronize_session=False)
+    )
+    _copy_to_listings(db)
+    return result.rowcount
@@ -0,0 +1,55 @@
+# app/utils/search.py
+import re
+from typing import List
+
+from sqlalchemy import func, literal_column, or_, and_
+from sqlalchemy.orm import Query, Session
+
+from app.models.listing import Listing
+
+# Generated tsvector over title/description, created by migration 0c47657d43ef.
+# It is PostgreSQL-only, so it is not mapped on the Listing model (SQLite
+# schemas built from the models simply don't have it).
+LISTING_SEARCH_VECTOR = literal_column("listings.search_vector")
+# 'simple' does no stemming, which suits mixed-language listings
+SEARCH_CONFIG = "simple"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def keyword_tokens(keyword: str) -> List[str]:
+    return _TOKEN.findall(keyword.lower())
+
+
+def prefix_tsquery(tokens: List[str]) -> str:
+    """'fix pip' -> 'fix:* & pip:*' (every word must match, last ones as prefixes)"""
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def uses_full_text_search(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def apply_keyword_search(query: Query, db: Session, keyword: str, order: bool = True) -> Query:
+    """
+    Filter a Listing query by keyword.
+    PostgreSQL: prefix-matching full-text search on the GIN-indexed
+    search_vector, ordered by ts_rank when `order` is set.
+    Other databases (SQLite in tests): every word must appear in the title
+    or description (ILIKE), in default order.
+    """
+    tokens = keyword_tokens(keyword)
+    if not tokens:
+        return query
+
+    if uses_full_text_search(db):
+        ts_query = func.to_tsquery(SEARCH_CONFIG, prefix_tsquery(tokens))
+        query = query.filter(LISTING_SEARCH_VECTOR.op("@@")(ts_query))
+        if order:
+            query = query.order_by(func.ts_rank(LISTING_SEARCH_VECTOR, ts_query).desc(), Listing.id.desc())
+        return query
+
+    return query.filter(and_(*[
+        or_(Listing.title.ilike(f"%{token}%"), Listing.description.ilike(f"%{token}%"))
+        for token in tokens
+    ]))
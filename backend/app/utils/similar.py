@@ -0,0 +1,223 @@
+# app/utils/similar.py
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, diags
+
+from app.database import ReplicaSessionLocal
+from app.models.listing import Listing
+from app.models.service import Service
+from app.utils.search import keyword_tokens
+
+logger = logging.getLogger(__name__)
+
+# Neighbours kept per listing (the largest limit the endpoint allows)
+SIMILAR_K = 20
+# Above this share of changed listings, rebuild everything (vocabulary and
+# IDF included) instead of patching the table
+FULL_REBUILD_FRACTION = 0.2
+# Incremental updates keep the old vocabulary, so rebuild at least this often
+FULL_REBUILD_SECONDS = 6 * 3600
+# Similarity scores computed per matrix product, bounding memory use
+BLOCK_CELLS = 2_000_000
+
+Neighbours = List[Tuple[int, float]]
+
+
+def listing_terms(title: Optional[str], description: Optional[str], service_name: Optional[str]) -> Counter:
+    """Term counts for a listing; title words count twice"""
+    return Counter(
+        keyword_tokens(title or "") * 2 + keyword_tokens(description or "") + keyword_tokens(service_name or "")
+    )
+
+
+def _vectorize(documents: List[Counter], vocabulary: Dict[str, int], idf: np.ndarray) -> csr_matrix:
+    """L2-normalized sublinear TF-IDF rows; terms outside the vocabulary are ignored"""
+    indptr, indices, data = [0], [], []
+    for counts in documents:
+        for term, count in counts.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                indices.append(column)
+                data.append((1.0 + math.log(count)) * idf[column])
+        indptr.append(len(indices))
+    matrix = csr_matrix((data, indices, indptr), shape=(len(documents), len(vocabulary)), dtype=np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return csr_matrix(diags(1.0 / norms) @ matrix)
+
+
+class SimilarListings:
+    """
+    Precomputed nearest-neighbour table over TF-IDF vectors of listing
+    title, description and service name (cosine similarity).
+
+    update() is called by a background job with every available listing.
+    When few listings changed it keeps the vocabulary and IDF weights and
+    only computes similarities against the changed rows: changed listings
+    get fresh neighbour lists, lists that contained a changed or removed
+    listing are recomputed, and the rest merge in the changed listings as
+    candidates. Larger changes, and the periodic refresh of vocabulary
+    and IDF weights, rebuild the whole table.
+    """
+    def __init__(self, k: int = SIMILAR_K):
+        self.k = k
+        self._lock = threading.Lock()
+        self._vocabulary: Dict[str, int] = {}
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._signatures: Dict[int, int] = {}
+        self._neighbours: Dict[int, Neighbours] = {}
+        self.ready = False
+        self.built_at: Optional[float] = None
+        self._full_built_at = 0.0
+
+    def neighbours(self, listing_id: int) -> Optional[Neighbours]:
+        """Most similar listings first, or None if the listing is not in the table"""
+        with self._lock:
+            return self._neighbours.get(listing_id)
+
+    def _top_k(self, matrix: csr_matrix, ids: List[int], rows: List[int]) -> Dict[int, Neighbours]:
+        """Neighbour lists for the given rows, computed in blocks"""
+        result = {}
+        block = max(1, BLOCK_CELLS // max(len(ids), 1))
+        transposed = matrix.T.tocsc()
+        for start in range(0, len(rows), block):
+            block_rows = rows[start:start + block]
+            scores = (matrix[block_rows] @ transposed).toarray()
+            for position, row in enumerate(block_rows):
+                similarities = scores[position]
+                similarities[row] = 0.0
+                count = min(self.k, len(ids) - 1)
+                if count <= 0:
+                    result[ids[row]] = []
+                    continue
+                best = np.argpartition(-similarities, count - 1)[:count]
+                best = best[np.argsort(-similarities[best], kind="stable")]
+                result[ids[row]] = [(ids[i], float(similarities[i])) for i in best if similarities[i] > 0]
+        return result
+
+    def _full_build(self, documents: Dict[int, Tuple[int, Counter]]) -> Dict:
+        ids = list(documents)
+        counts = [documents[i][1] for i in ids]
+        frequencies = Counter(term for document in counts for term in document)
+        vocabulary = {term: column for column, term in enumerate(sorted(frequencies))}
+        idf = np.array(
+            [math.log((1 + len(ids)) / (1 + frequencies[term])) + 1.0 for term in sorted(frequencies)],
+            dtype=np.float32,
+        )
+        matrix = _vectorize(counts, vocabulary, idf)
+        neighbours = self._top_k(matrix, ids, list(range(len(ids))))
+        with self._lock:
+            self._vocabulary, self._idf = vocabulary, idf
+            self._signatures = {i: documents[i][0] for i in ids}
+            self._neighbours = neighbours
+        self._full_built_at = time.monotonic()
+        return {"mode": "full", "listings": len(ids)}
+
+    def _incremental(self, documents: Dict[int, Tuple[int, Counter]], changed: List[int], removed: List[int]) -> Dict:
+        ids = list(documents)
+        rows = {listing_id: row for row, listing_id in enumerate(ids)}
+        matrix = _vectorize([documents[i][1] for i in ids], self._vocabulary, self._idf)
+
+        # Similarity of every listing to each changed one, a block of changed
+        # rows at a time like _top_k, collected per listing
+        changed_rows = [rows[i] for i in changed]
+        new_scores: Dict[int, Neighbours] = {}
+        block = max(1, BLOCK_CELLS // max(len(ids), 1))
+        transposed = matrix.T.tocsc()
+        for start in range(0, len(changed_rows), block):
+            scores = (matrix[changed_rows[start:start + block]] @ transposed).tocoo()
+            for position, column, score in zip(scores.row, scores.col, scores.data):
+                new_scores.setdefault(ids[column], []).append((changed[start + position], float(score)))
+
+        touched = set(changed) | set(removed)
+        recompute = list(changed_rows)
+        updates: Dict[int, Neighbours] = {}
+        with self._lock:
+            current = dict(self._neighbours)
+        for listing_id in ids:
+            if listing_id in touched:
+                continue
+            existing = current.get(listing_id, [])
+            if any(neighbour in touched for neighbour, _ in existing):
+                recompute.append(rows[listing_id])
+            elif listing_id in new_scores:
+                candidates = existing + new_scores[listing_id]
+                candidates.sort(key=lambda pair: -pair[1])
+                updates[listing_id] = candidates[:self.k]
+        updates.update(self._top_k(matrix, ids, recompute))
+
+        with self._lock:
+            for listing_id in removed:
+                self._neighbours.pop(listing_id, None)
+                self._signatures.pop(listing_id, None)
+            self._neighbours.update(updates)
+            for listing_id in changed:
+                self._signatures[listing_id] = documents[listing_id][0]
+        return {"mode": "incremental", "changed": len(changed), "removed": len(removed), "recomputed": len(recompute)}
+
+    def update(self, documents: Dict[int, Tuple[int, Counter]]) -> Dict:
+        """
+        Bring the table up to date with `documents` ({id: (signature,
+        term counts)} for every available listing, see load_documents).
+        """
+        changed = [i for i, (signature, _) in documents.items() if self._signatures.get(i) != signature]
+        removed = [i for i in self._signatures if i not in documents]
+        if (
+            not self.ready
+            or len(changed) + len(removed) > FULL_REBUILD_FRACTION * max(len(documents), 1)
+            or time.monotonic() - self._full_built_at > FULL_REBUILD_SECONDS
+        ):
+            result = self._full_build(documents)
+        elif changed or removed:
+            result = self._incremental(documents, changed, removed)
+        else:
+            result = {"mode": "unchanged"}
+        self.ready = True
+        self.built_at = time.time()
+        return result
+
+
+similar_listings = SimilarListings()
+
+
+def load_documents(db) -> Dict[int, Tuple[int, Counter]]:
+    """Signature and term counts of every available listing, in one query"""
+    rows = (
+        db.query(Listing.id, Listing.title, Listing.description, Service.name)
+        .outerjoin(Service, Service.id == Listing.service_id)
+        .filter(Listing.available == True)
+        .all()
+    )
+    return {
+        listing_id: (hash((title, description, service_name)), listing_terms(title, description, service_name))
+        for listing_id, title, description, service_name in rows
+    }
+
+
+def _update_from_database() -> Dict:
+    db = ReplicaSessionLocal()
+    try:
+        documents = load_documents(db)
+    finally:
+        db.close()
+    return similar_listings.update(documents)
+
+
+async def keep_similar_listings_fresh(interval_seconds: float):
+    """Build the neighbour table, then patch it with listing changes every interval"""
+    while True:
+        try:
+            started = time.perf_counter()
+            result = await asyncio.to_thread(_update_from_database)
+            if result["mode"] != "unchanged":
+                logger.info(f"Updated similar listings ({result}) in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            logger.error(f"Similar listings update failed: {e}")
+        await asyncio.sleep(interval_seconds)
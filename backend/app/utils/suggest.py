@@ -0,0 +1,223 @@
+# app/utils/suggest.py
+import asyncio
+import bisect
+import heapq
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database import ReplicaSessionLocal
+from app.models.category import Category
+from app.models.listing import Listing
+from app.models.request import Request
+from app.models.service import Service
+from app.utils.search import keyword_tokens
+
+logger = logging.getLogger(__name__)
+
+# (kind, id) of the listing, service or category a suggestion came from
+EntryKey = Tuple[str, int]
+# Completions kept per prefix (the largest limit the endpoint allows)
+MAX_SUGGESTIONS = 20
+# Prefixes up to this length are precomputed on refresh, since their
+# ranges are the longest to scan; longer ones are cached on first use
+WARM_PREFIX_LENGTH = 2
+RESULT_CACHE_SIZE = 4096
+
+
+def normalize(text: str) -> str:
+    return " ".join(keyword_tokens(text or ""))
+
+
+def _rank(entry: Dict):
+    # Highest weight first; ties go to the shorter text, then alphabetically
+    return -entry["weight"], len(entry["text"]), entry["text"]
+
+
+def _top(phrases: List[Tuple[str, EntryKey]], entries: Dict[EntryKey, Dict], prefix: str) -> List[Dict]:
+    """Best MAX_SUGGESTIONS entries with a phrase starting with prefix"""
+    # Every phrase starting with prefix sorts between these two
+    start = bisect.bisect_left(phrases, (prefix,))
+    end = bisect.bisect_left(phrases, (prefix + "\uffff",), start)
+    matched = {key: entries[key] for _, key in phrases[start:end]}
+    return heapq.nsmallest(MAX_SUGGESTIONS, matched.values(), key=_rank)
+
+
+class SuggestionIndex:
+    """
+    Autocomplete over listing titles, service names and category names.
+
+    A sorted array of (phrase, entry) pairs holds every word-suffix of each
+    name ("fix leaky pipes" is also found as "leaky pipes" and "pipes"), so
+    a prefix's matches are one contiguous range found by bisection. The top
+    completions per prefix are cached: one- and two-letter prefixes (the
+    longest ranges) are computed on refresh, the rest on first use.
+
+    Weights are popularity: requests received for a listing, available
+    listings for a service or category. Entries are added, renamed and
+    removed in place (patching the cached prefixes they affect); weights
+    are refreshed from the database periodically.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries: Dict[EntryKey, Dict] = {}
+        self._phrases: List[Tuple[str, EntryKey]] = []
+        self._warm: Dict[str, List[Dict]] = {}
+        self._cache: Dict[str, List[Dict]] = {}
+        self.ready = False
+        self.refreshed_at: Optional[float] = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _suffixes(text: str) -> List[str]:
+        words = normalize(text).split()
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def _cached_prefixes(self):
+        for cache in (self._warm, self._cache):
+            for prefix, results in list(cache.items()):
+                yield cache, prefix, results
+
+    def upsert(self, kind: str, entry_id: int, text: str, weight: Optional[int] = None):
+        """Add or rename an entry; weight defaults to the entry's current one"""
+        if not self.ready:
+            return  # the first refresh will load it
+        key = (kind, entry_id)
+        with self._lock:
+            previous = self._entries.get(key)
+            if weight is None:
+                weight = previous["weight"] if previous else 0
+            self.remove(kind, entry_id)
+            entry = self._entries[key] = {"text": text, "type": kind, "id": entry_id, "weight": weight}
+            suffixes = self._suffixes(text)
+            for phrase in suffixes:
+                bisect.insort(self._phrases, (phrase, key))
+            # Merge the entry into cached prefixes it now matches
+            for cache, prefix, results in self._cached_prefixes():
+                if any(suffix.startswith(prefix) for suffix in suffixes):
+                    if len(results) < MAX_SUGGESTIONS or _rank(entry) < _rank(results[-1]):
+                        cache[prefix] = sorted(results + [entry], key=_rank)[:MAX_SUGGESTIONS]
+
+    def remove(self, kind: str, entry_id: int):
+        if not self.ready:
+            return
+        key = (kind, entry_id)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return
+            for phrase in self._suffixes(entry["text"]):
+                position = bisect.bisect_left(self._phrases, (phrase, key))
+                if position < len(self._phrases) and self._phrases[position] == (phrase, key):
+                    self._phrases.pop(position)
+            # Cached prefixes that listed it need recomputing
+            for cache, prefix, results in self._cached_prefixes():
+                if entry in results:
+                    if len(prefix) <= WARM_PREFIX_LENGTH:
+                        cache[prefix] = _top(self._phrases, self._entries, prefix)
+                    else:
+                        del cache[prefix]
+
+    def suggest(self, query: str, limit: int = 8) -> List[Dict]:
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        # A trailing space means the last word is complete
+        if query[-1:].isspace():
+            prefix += " "
+        with self._lock:
+            results = self._warm.get(prefix)
+            if results is None:
+                results = self._cache.get(prefix)
+            if results is None:
+                results = _top(self._phrases, self._entries, prefix)
+                if len(self._cache) >= RESULT_CACHE_SIZE:
+                    # Evict the oldest entry (dicts keep insertion order)
+                    del self._cache[next(iter(self._cache))]
+                self._cache[prefix] = results
+        return results[:limit]
+
+    @staticmethod
+    def load_entries(db: Session) -> List[Tuple[str, int, str, int]]:
+        """(kind, id, text, weight) for every suggestion, in three grouped queries"""
+        request_counts = (
+            db.query(Request.listing_id, func.count(Request.id).label("requests"))
+            .group_by(Request.listing_id)
+            .subquery()
+        )
+        listings = (
+            db.query(Listing.id, Listing.title, func.coalesce(request_counts.c.requests, 0))
+            .outerjoin(request_counts, request_counts.c.listing_id == Listing.id)
+            .filter(Listing.available == True)
+            .all()
+        )
+        services = (
+            db.query(Service.id, Service.name, func.count(Listing.id))
+            .outerjoin(Listing, (Listing.service_id == Service.id) & (Listing.available == True))
+            .group_by(Service.id, Service.name)
+            .all()
+        )
+        categories = (
+            db.query(Category.id, Category.name, func.count(Listing.id))
+            .outerjoin(Service, Service.category_id == Category.id)
+            .outerjoin(Listing, (Listing.service_id == Service.id) & (Listing.available == True))
+            .group_by(Category.id, Category.name)
+            .all()
+        )
+        return (
+            [("listing", *row) for row in listings]
+            + [("service", *row) for row in services]
+            + [("category", *row) for row in categories]
+        )
+
+    def refresh(self, db: Session) -> int:
+        """Reload every entry and weight from the database and swap them in"""
+        entries, phrases = {}, []
+        for kind, entry_id, text, weight in self.load_entries(db):
+            entries[(kind, entry_id)] = {"text": text, "type": kind, "id": entry_id, "weight": weight}
+            phrases.extend((phrase, (kind, entry_id)) for phrase in self._suffixes(text))
+        phrases.sort()
+        warm_prefixes = {phrase[:n] for phrase, _ in phrases for n in range(1, WARM_PREFIX_LENGTH + 1)}
+        warm = {prefix: _top(phrases, entries, prefix) for prefix in warm_prefixes}
+        with self._lock:
+            self._entries, self._phrases, self._warm = entries, phrases, warm
+            self._cache = {}
+            self.ready = True
+            self.refreshed_at = time.time()
+        return len(entries)
+
+    def ensure_ready(self, db: Session):
+        """Build on first use when the background refresh has not run yet"""
+        if not self.ready:
+            with self._lock:
+                if not self.ready:
+                    self.refresh(db)
+
+
+suggestions = SuggestionIndex()
+
+
+def _refresh_from_database() -> int:
+    db = ReplicaSessionLocal()
+    try:
+        return suggestions.refresh(db)
+    finally:
+        db.close()
+
+
+async def keep_suggestions_fresh(interval_seconds: float):
+    """Rebuild suggestions and their popularity weights every interval"""
+    while True:
+        try:
+            started = time.perf_counter()
+            count = await asyncio.to_thread(_refresh_from_database)
+            logger.debug(f"Refreshed {count} search suggestions in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            logger.error(f"Search suggestion refresh failed: {e}")
+        await asyncio.sleep(interval_seconds)
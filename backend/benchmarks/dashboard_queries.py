@@ -0,0 +1,57 @@
+# benchmarks/dashboard_queries.py
+"""
+Show that the dashboards issue a constant number of SQL statements.
+
+Grows one provider's and one customer's history and asserts the statement count reported in
+the Server-Timing header stays flat.
+
+    cd backend && python -m benchmarks.dashboard_queries
+"""
+import random
+import re
+import time
+
+from benchmarks.seed import reset_schema, seed_catalog, seed_activity, auth_headers
+
+from fastapi.testclient import TestClient
+from app.database import SessionLocal
+from app.main import app
+
+SIZES = (10, 100, 1000)
+DASHBOARDS = ("provider", "customer")
+QUERY_COUNT = re.compile(r'desc="(\d+) queries"')
+
+
+def measure(client: TestClient, path: str, headers: dict):
+    start = time.perf_counter()
+    response = client.get(path, headers=headers)
+    elapsed = time.perf_counter() - start
+    response.raise_for_status()
+    return int(QUERY_COUNT.search(response.headers["server-timing"]).group(1)), elapsed
+
+
+def main():
+    client = TestClient(app)
+    results = {role: [] for role in DASHBOARDS}
+    for size in SIZES:
+        reset_schema()
+        rng = random.Random(size)
+        db = SessionLocal()
+        providers, listings = seed_catalog(db, rng, providers=1, listings_per_provider=5)
+        customers = seed_activity(db, rng, listings, customers=1, requests_per_customer=size)
+        user_ids = {"provider": providers[0].id, "customer": customers[0].id}
+        db.close()
+
+        for role in DASHBOARDS:
+            user_id = user_ids[role]
+            queries, elapsed = measure(client, f"/dashboard/{role}", auth_headers(user_id))
+            results[role].append(queries)
+            print(f"{role:9} dashboard  rows={size:6}  queries={queries:4}  time={elapsed * 1000:8.1f} ms")
+
+    for role, counts in results.items():
+        assert len(set(counts)) == 1, f"{role} dashboard query count grows with data: {counts}"
+    print("OK: query counts are independent of data volume")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# benchmarks/index_usage.py
+"""
+Seed data and assert via EXPLAIN that each router's main query is served by
+an index rather than a sequential scan.
+
+Works on PostgreSQL (EXPLAIN (FORMAT JSON), looks for "Seq Scan" nodes) and
+SQLite (EXPLAIN QUERY PLAN, looks for "SCAN <table>" without an index).
+
+    cd backend && python -m benchmarks.index_usage
+    DATABASE_URL=postgresql://... python -m benchmarks.index_usage
+"""
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, text, or_, tuple_
+
+from benchmarks.seed import engine, reset_schema, seed_catalog, seed_activity
+from app.database import SessionLocal
+from app.models import Listing, Request, Quote, Booking, Notification, Review
+
+CUSTOMERS = 2000
+REQUESTS_PER_CUSTOMER = 5
+PROVIDERS = 200
+
+
+def main_queries(ids: dict):
+    """The main query of each router, as the routers build them"""
+    return {
+        "listing.get_my_listings": select(Listing).filter(Listing.user_id == ids["provider"]),
+        "listing.get_listings_by_service_id": select(Listing).filter(
+            Listing.service_id == ids["service"], Listing.available == True
+        ),
+        "listing.min_rating": select(Listing).filter(
+            Listing.service_id == ids["service"], Listing.available == True, Listing.provider_rating >= 4
+        ).order_by(Listing.provider_rating.desc()),
+        "listing.price_keyset": select(Listing).filter(
+            Listing.service_id == ids["service"], Listing.available == True,
+            tuple_(Listing.min_price, Listing.id) > tuple_(50, ids["listing"])
+        ).order_by(Listing.min_price, Listing.id).limit(21),
+        "listing.near": select(Listing).filter(Listing.geohash >= "sn9b", Listing.geohash < "sn9b{"),
+        "request.get_my_requests": select(Request).filter(Request.user_id == ids["customer"]),
+        "dashboard.provider_requests": select(Request).filter(Request.listing_id == ids["listing"]),
+        "quote.get_quotes_for_request": select(Quote).filter(Quote.request_id == ids["request"]),
+        "dashboard.provider_quotes": select(Quote).filter(Quote.provider_id == ids["provider"]),
+        "booking.get_user_bookings": select(Booking).filter(
+            or_(Booking.customer_id == ids["customer"], Booking.provider_id == ids["customer"])
+        ),
+        "dashboard.bookings_by_quote": select(Booking).filter(Booking.quote_id == ids["quote"]),
+        "notification.get_notifications": select(Notification)
+            .filter(Notification.user_id == ids["customer"])
+            .order_by(Notification.created_at.desc()),
+        "notification.get_unread_count": select(Notification).filter(
+            Notification.user_id == ids["customer"], Notification.is_read == False
+        ),
+        "review.get_reviews_about_user": select(Review).filter(Review.reviewee_id == ids["provider"]),
+        "review.get_reviews_by_customer_id": select(Review).filter(Review.reviewer_id == ids["customer"]),
+        "review.get_review_by_booking_id": select(Review).filter(
+            Review.booking_id == ids["booking"], Review.reviewer_id == ids["customer"]
+        ),
+    }
+
+
+def seq_scans(conn, statement) -> list:
+    """Tables read by a full sequential scan in the plan for `statement`"""
+    sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    if engine.dialect.name == "postgresql":
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        found = []
+
+        def walk(node):
+            if node.get("Node Type") == "Seq Scan":
+                found.append(node.get("Relation Name"))
+            for child in node.get("Plans", []):
+                walk(child)
+
+        walk(plan[0]["Plan"])
+        return found
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return [row[-1] for row in rows if row[-1].startswith("SCAN ") and "INDEX" not in row[-1]]
+
+
+def seed_notifications(db, rng: random.Random, user_ids, per_user: int = 5):
+    now = datetime.utcnow()
+    db.add_all([
+        Notification(user_id=user_id, type="test", message="bench", is_read=rng.random() > 0.3,
+                     created_at=now - timedelta(minutes=rng.randint(0, 100000)))
+        for user_id in user_ids for _ in range(per_user)
+    ])
+    db.commit()
+
+
+def main():
+    start = time.perf_counter()
+    reset_schema()
+    rng = random.Random(42)
+    db = SessionLocal()
+    providers, listings = seed_catalog(db, rng, providers=PROVIDERS, listings_per_provider=5)
+    customers = seed_activity(db, rng, listings, customers=CUSTOMERS, requests_per_customer=REQUESTS_PER_CUSTOMER)
+    seed_notifications(db, rng, [u.id for u in customers + providers])
+    booking = db.query(Booking).order_by(Booking.id.desc()).first()
+    ids = {
+        "provider": booking.provider_id,
+        "customer": booking.customer_id,
+        "service": listings[-1].service_id,
+        "listing": booking.listing_id,
+        "quote": booking.quote_id,
+        "request": db.get(Quote, booking.quote_id).request_id,
+        "booking": booking.id,
+    }
+    db.close()
+    print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+    failures = []
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        for name, statement in main_queries(ids).items():
+            scans = seq_scans(conn, statement)
+            print(f"{'SEQ SCAN' if scans else 'index   '}  {name}{'  ' + ', '.join(map(str, scans)) if scans else ''}")
+            if scans:
+                failures.append(name)
+
+    assert not failures, f"Sequential scans in: {', '.join(failures)}"
+    print("OK: every main query uses an index")
+
+
+if __name__ == "__main__":
+    main()
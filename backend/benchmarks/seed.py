@@ -0,0 +1,104 @@
+# benchmarks/seed.py
+"""
+Synthetic data for the benchmark scripts.
+
+Benchmarks default to a throwaway SQLite file; set DATABASE_URL before
+running them to benchmark against PostgreSQL instead. The target database is
+dropped and recreated, so never point it at real data.
+"""
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+BENCH_DB = os.path.join(tempfile.gettempdir(), "freelancers_bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DB}")
+# Benchmarks count queries themselves; keep N+1 warnings out of the output
+os.environ.setdefault("SQL_N_PLUS_ONE_THRESHOLD", "1000000000")
+
+from app.database import Base, engine  # noqa: E402
+from app.models import User, Profile, Category, Service, Listing, Request, Quote, Booking, Review  # noqa: E402
+from app.utils.auth import create_access_token  # noqa: E402
+
+WORDS = (
+    "plumbing electrical repair cleaning garden painting tutoring moving carpentry "
+    "wiring leak roof tiles furniture assembly appliance laptop phone delivery "
+    "wedding photography catering design logo website translation fitness yoga"
+).split()
+CITIES = ["Algiers", "Oran", "Constantine", "Annaba", "Blida", "Setif", "Batna", "Tlemcen"]
+
+
+def reset_schema():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def auth_headers(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def _text(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def seed_catalog(db, rng: random.Random, providers: int = 5, listings_per_provider: int = 4, services: int = 6):
+    """Categories, services, providers with profiles and their listings"""
+    category = Category(name=f"Category {rng.random()}")
+    db.add(category)
+    db.flush()
+    service_objs = [Service(name=f"{rng.choice(WORDS).title()} {i}", category_id=category.id) for i in range(services)]
+    db.add_all(service_objs)
+    provider_objs = [User(email=f"provider{i}.{rng.random()}@bench.local", hashed_password="x", role="provider") for i in range(providers)]
+    db.add_all(provider_objs)
+    db.flush()
+    db.add_all([Profile(user_id=p.id, full_name=f"Provider {p.id}", location=rng.choice(CITIES)) for p in provider_objs])
+    listing_objs = []
+    now = datetime.utcnow()
+    for p in provider_objs:
+        for _ in range(listings_per_provider):
+            low = rng.randint(10, 200)
+            listing_objs.append(Listing(
+                user_id=p.id,
+                service_id=rng.choice(service_objs).id,
+                title=_text(rng, 3).title(),
+                description=_text(rng, 12),
+                min_price=low,
+                max_price=low + rng.randint(0, 300),
+                location=rng.choice(CITIES),
+                available=rng.random() > 0.1,
+                created_at=now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+            ))
+    db.add_all(listing_objs)
+    db.commit()
+    return provider_objs, listing_objs
+
+
+def seed_activity(db, rng: random.Random, listings, customers: int, requests_per_customer: int, review=True):
+    """Customers with requests, quotes, completed bookings and reviews"""
+    customer_objs = [User(email=f"customer{i}.{rng.random()}@bench.local", hashed_password="x", role="customer") for i in range(customers)]
+    db.add_all(customer_objs)
+    db.flush()
+    db.add_all([Profile(user_id=c.id, full_name=f"Customer {c.id}", location=rng.choice(CITIES)) for c in customer_objs])
+    now = datetime.utcnow()
+    for c in customer_objs:
+        for _ in range(requests_per_customer):
+            listing = rng.choice(listings)
+            created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+            req = Request(user_id=c.id, listing_id=listing.id, description=_text(rng, 6), location=rng.choice(CITIES),
+                          preferred_date=created + timedelta(days=3), status="booked", created_at=created)
+            db.add(req)
+            db.flush()
+            quote = Quote(provider_id=listing.user_id, request_id=req.id, listing_id=listing.id,
+                          price=rng.randint(20, 400), status="accepted", created_at=created)
+            db.add(quote)
+            db.flush()
+            booking = Booking(quote_id=quote.id, customer_id=c.id, provider_id=listing.user_id, listing_id=listing.id,
+                              scheduled_time=created + timedelta(days=3), status="completed", created_at=created,
+                              has_review=review)
+            db.add(booking)
+            db.flush()
+            if review:
+                db.add(Review(booking_id=booking.id, reviewer_id=c.id, reviewee_id=listing.user_id,
+                              rating=rng.randint(1, 5), comment=_text(rng, 5)))
+    db.commit()
+    return customer_objs
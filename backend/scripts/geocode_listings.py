@@ -0,0 +1,89 @@
+# scripts/geocode_listings.py
+"""
+Backfill latitude, longitude and geohash for listings that only have a
+free-text location, using a local gazetteer file (no network service).
+
+    cd backend && python -m scripts.geocode_listings --gazetteer cities1000.txt
+    cd backend && GAZETTEER_PATH=places.csv python -m scripts.geocode_listings
+
+The gazetteer is a CSV with a name,latitude,longitude[,population] header or
+a GeoNames dump (see app.utils.geo.Gazetteer). Listings are processed in id
+order, one committed batch at a time, so the script can be interrupted and
+rerun. Workers serving LISTING_SEARCH_BACKEND=memory pick up the new
+coordinates at their next index resync (LISTING_INDEX_SYNC_SECONDS).
+"""
+import argparse
+import logging
+
+from sqlalchemy import bindparam, select, update
+
+from app.core.config import Config
+from app.database import SessionLocal
+from app.models.listing import Listing
+from app.utils.geo import Gazetteer, geohash_encode
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def geocode_listings(db, gazetteer: Gazetteer, batch_size: int = 1000) -> tuple:
+    """Geocode listings without coordinates; returns (geocoded, not found)"""
+    statement = (
+        update(Listing)
+        .where(Listing.id == bindparam("listing_id"))
+        .values(latitude=bindparam("lat"), longitude=bindparam("lon"), geohash=bindparam("hash"))
+        .execution_options(synchronize_session=False)
+    )
+    geocoded = missed = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Listing.id, Listing.location)
+            .where(Listing.id > last_id, Listing.latitude.is_(None), Listing.location.isnot(None))
+            .order_by(Listing.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        params = []
+        for row in rows:
+            coordinates = gazetteer.lookup(row.location)
+            if coordinates is None:
+                missed += 1
+                continue
+            lat, lon = coordinates
+            params.append({"listing_id": row.id, "lat": lat, "lon": lon, "hash": geohash_encode(lat, lon)})
+        if params:
+            db.connection().execute(statement, params)
+        db.commit()
+        geocoded += len(params)
+        logger.info(f"Geocoded {geocoded} listings so far (up to id {last_id})")
+    return geocoded, missed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--gazetteer", default=Config.GAZETTEER_PATH, help="gazetteer file (default: GAZETTEER_PATH)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    if not args.gazetteer:
+        parser.error("pass --gazetteer or set GAZETTEER_PATH")
+
+    gazetteer = Gazetteer.load(args.gazetteer)
+    logger.info(f"Loaded {len(gazetteer)} places from {args.gazetteer}")
+
+    db = SessionLocal()
+    try:
+        geocoded, missed = geocode_listings(db, gazetteer, args.batch_size)
+        logger.info(f"Geocoded {geocoded} listings; {missed} locations not found in the gazetteer")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
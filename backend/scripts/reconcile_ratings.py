@@ -0,0 +1,37 @@
+# scripts/reconcile_ratings.py
+"""
+Recompute every profile's rating_count, rating_sum and average_rating from
+the reviews table in one set-based UPDATE, and refresh the copies on
+listings (provider_rating, provider_review_count).
+
+Ratings are maintained incrementally on each review write; run this after
+bulk imports or deletes that bypass the API (e.g. cascaded booking deletes).
+Workers serving LISTING_SEARCH_BACKEND=memory pick up the new listing
+ratings at their next index resync (LISTING_INDEX_SYNC_SECONDS).
+
+    cd backend && python -m scripts.reconcile_ratings
+"""
+import logging
+
+from app.database import SessionLocal
+from app.utils.ratings import reconcile_ratings
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    db = SessionLocal()
+    try:
+        updated = reconcile_ratings(db)
+        db.commit()
+        logger.info(f"Reconciled ratings for {updated} profiles")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
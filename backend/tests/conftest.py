@@ -0,0 +1,25 @@
+import os
+import tempfile
+
+# Point the app at a throwaway SQLite database before it creates its engines
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/tests.db"
+
+import pytest
+
+from app.database import Base, SessionLocal, engine
+
+
+@pytest.fixture(scope="module")
+def schema():
+    """A fresh schema per test module"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def db(schema):
+    session = SessionLocal()
+    yield session
+    session.close()
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+import app.models as models
+from app.models.booking import BookingStatus
+from app.utils.auth import create_access_token
+
+
+def make_user(db, email: str, role: str, full_name: str = None) -> models.User:
+    user = models.User(email=email, hashed_password="x", role=role)
+    db.add(user)
+    db.flush()
+    db.add(models.Profile(user_id=user.id, full_name=full_name or email.split("@")[0]))
+    db.commit()
+    return user
+
+
+def make_service(db, name: str = "Home services") -> models.Service:
+    category = models.Category(name=f"{name} category")
+    db.add(category)
+    db.flush()
+    service = models.Service(name=name, category_id=category.id)
+    db.add(service)
+    db.commit()
+    return service
+
+
+def auth_headers(user_id: int) -> dict:
+    return {"Authorization": "Bearer " + create_access_token({"sub": str(user_id)})}
+
+
+def make_booking(db, customer: models.User, listing: models.Listing) -> models.Booking:
+    """A completed booking of `listing` by `customer`, ready to be reviewed"""
+    request = models.Request(user_id=customer.id, listing_id=listing.id, description="Please help")
+    db.add(request)
+    db.flush()
+    quote = models.Quote(provider_id=listing.user_id, request_id=request.id, listing_id=listing.id, price=20)
+    db.add(quote)
+    db.flush()
+    booking = models.Booking(
+        quote_id=quote.id, customer_id=customer.id, provider_id=listing.user_id, listing_id=listing.id,
+        scheduled_time=datetime.utcnow(), status=BookingStatus.completed,
+    )
+    db.add(booking)
+    db.commit()
+    return booking
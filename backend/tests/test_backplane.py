@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from app.sockets import backplane as backplanes
+from app.sockets.backplane import InMemoryBackplane, RedisBackplane, RespConnection
+
+
+class FakeWriter:
+    def __init__(self, on_write=None):
+        self.written = b""
+        self.on_write = on_write
+        self.closed = False
+
+    def write(self, data):
+        self.written += data
+        if self.on_write:
+            self.on_write()
+
+    async def drain(self):
+        pass
+
+    def is_closing(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+
+def connection(replies: bytes = b"", eof: bool = False, on_write=None) -> RespConnection:
+    reader = asyncio.StreamReader()
+    reader.feed_data(replies)
+    if eof:
+        reader.feed_eof()
+    return RespConnection(reader, FakeWriter(on_write))
+
+
+def test_memory_backplane_delivers_in_process():
+    async def scenario():
+        received = []
+
+        async def deliver(user_id, message):
+            received.append((user_id, message))
+
+        plane = InMemoryBackplane("test")
+        await plane.publish(1, {"type": "early"})
+        await plane.start(deliver)
+        await plane.publish(2, {"type": "notification"})
+        await plane._receive(plane.encode(3, {"type": "encoded"}))
+        return received
+
+    assert asyncio.run(scenario()) == [(2, {"type": "notification"}), (3, {"type": "encoded"})]
+
+
+def test_resp_replies_are_parsed():
+    async def scenario():
+        conn = connection(
+            b"+OK\r\n:3\r\n$5\r\nhello\r\n$-1\r\n*-1\r\n"
+            b"*3\r\n$7\r\nmessage\r\n$4\r\nchan\r\n$0\r\n\r\n"
+            b"-ERR unknown command\r\n"
+        )
+        replies = [await conn.read() for _ in range(6)]
+        with pytest.raises(RuntimeError, match="unknown command"):
+            await conn.read()
+        return replies
+
+    assert asyncio.run(scenario()) == ["OK", 3, b"hello", None, None, [b"message", b"chan", b""]]
+
+
+def test_resp_commands_are_encoded():
+    async def scenario():
+        conn = connection(b":1\r\n")
+        assert await conn.command("PUBLISH", "chan", "héllo") == 1
+        return conn.writer.written
+
+    assert asyncio.run(scenario()) == b"*3\r\n$7\r\nPUBLISH\r\n$4\r\nchan\r\n$6\r\nh\xc3\xa9llo\r\n"
+
+
+def test_redis_publish_retries_only_unsent_commands(monkeypatch):
+    async def scenario():
+        plane = RedisBackplane("chan", "redis://localhost:6379")
+        opened = []
+
+        async def open_connection(url):
+            opened.append(connection(b":1\r\n"))
+            return opened[-1]
+
+        monkeypatch.setattr(backplanes.RespConnection, "open", open_connection)
+
+        # The server closed the idle connection: nothing written, so resent once
+        stale = plane._publisher = connection(eof=True)
+        await plane.publish(1, {"type": "a"})
+        assert stale.writer.written == b"" and len(opened) == 1
+        assert opened[0].writer.written.count(b"PUBLISH") == 1
+
+        # The connection drops after the command went out: not repeated
+        dropped = plane._publisher = connection()
+        dropped.writer.on_write = dropped.reader.feed_eof
+        with pytest.raises(ConnectionError):
+            await plane.publish(1, {"type": "b"})
+        assert dropped.writer.written.count(b"PUBLISH") == 1
+        assert len(opened) == 1 and plane._publisher is None
+
+        # The next publish reconnects
+        await plane.publish(1, {"type": "c"})
+        assert len(opened) == 2
+
+    asyncio.run(scenario())
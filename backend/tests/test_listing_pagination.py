@@ -0,0 +1,82 @@
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.models as models
+from app.database import SessionLocal
+from app.main import app
+from tests.helpers import make_service, make_user
+
+# Repeated prices, so the id tie-breaker decides the order within a price
+PRICES = [30, 10, 20, 10, 30, 20, 10, 40, 20, 10, 30, 50]
+
+
+def raw_cursor(data) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+@pytest.fixture(scope="module")
+def client(schema):
+    db = SessionLocal()
+    provider = make_user(db, "pages@example.com", "provider")
+    service = make_service(db)
+    for i, price in enumerate(PRICES):
+        db.add(models.Listing(
+            user_id=provider.id, service_id=service.id, title=f"Listing {i}",
+            min_price=price, max_price=price + 10, provider_rating=(i % 5) * 1.0,
+        ))
+    db.commit()
+    db.close()
+    return TestClient(app)
+
+
+def walk(client, sort, limit):
+    """Every page of a cursor walk, as lists of ids"""
+    pages, cursor = [], ""
+    while cursor is not None:
+        response = client.get("/listings/", params={"sort": sort, "cursor": cursor, "limit": limit})
+        assert response.status_code == 200
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+    return pages
+
+
+@pytest.mark.parametrize("sort", ["newest", "price", "rating"])
+def test_cursor_pages_match_the_full_ordering(client, sort):
+    full = [item["id"] for item in client.get("/listings/", params={"sort": sort, "limit": 100}).json()]
+    pages = walk(client, sort, limit=5)
+    assert [i for page in pages for i in page] == full
+    assert all(len(page) == 5 for page in pages[:-1])
+    assert len(full) == len(PRICES)
+
+
+def test_cursor_walk_is_stable(client):
+    assert walk(client, "price", limit=4) == walk(client, "price", limit=4)
+
+
+@pytest.mark.parametrize("sort, cursor", [
+    ("price", raw_cursor({"s": "price", "v": [1]})),
+    ("price", raw_cursor({"s": "price", "v": [10, 2, 3]})),
+    ("price", raw_cursor({"s": "price", "v": [10, 2.5]})),
+    ("price", raw_cursor({"s": "price", "v": [True, 2]})),
+    ("price", raw_cursor({"s": "price", "v": [None, 2]})),
+    ("newest", raw_cursor({"s": "newest", "v": []})),
+    ("newest", raw_cursor({"s": "newest", "v": "abc"})),
+    ("newest", raw_cursor({"s": "newest", "v": ["abc"]})),
+    ("newest", raw_cursor({"s": "newest"})),
+    ("newest", raw_cursor([1, 2])),
+    ("newest", "not-base64!"),
+    ("newest", raw_cursor({"s": "price", "v": [10, 2]})),
+])
+def test_bad_cursors_are_rejected(client, sort, cursor):
+    response = client.get("/listings/", params={"sort": sort, "cursor": cursor})
+    assert response.status_code == 400
+
+
+def test_datetime_cursor_values_are_accepted():
+    from app.utils.pagination import decode_cursor
+
+    position = decode_cursor(raw_cursor({"s": "price", "v": ["2025-01-02T03:04:05", 7]}), "price")
+    assert position[0].year == 2025 and position[1] == 7
@@ -0,0 +1,106 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app.models as models
+from app.core.config import Config
+from app.database import SessionLocal
+from app.main import app
+from app.utils.listing_index import listing_index
+from tests.helpers import auth_headers, make_booking, make_service, make_user
+
+LISTINGS = [
+    ("Plumbing repairs", "Leaky taps and pipes fixed"),
+    ("Emergency plumber", "Repairs of burst pipes, day and night"),
+    ("Bathroom plumbing", "Fitting and repair of showers"),
+    ("Plumbing installation", "New kitchens and bathrooms"),
+    ("Roof repairs", "Tiles and gutters"),
+]
+
+
+@pytest.fixture(scope="module")
+def client(schema):
+    db = SessionLocal()
+    provider = make_user(db, "provider@example.com", "provider")
+    service = make_service(db)
+    for title, description in LISTINGS:
+        db.add(models.Listing(
+            user_id=provider.id, service_id=service.id, title=title, description=description,
+            min_price=10, max_price=50, location="Algiers",
+        ))
+    db.commit()
+    listing_index.rebuild(db)
+    db.close()
+    # Without the context manager the lifespan (background jobs) does not run
+    yield TestClient(app)
+
+
+def search_ids(client, monkeypatch, backend, keyword):
+    monkeypatch.setattr(Config, "LISTING_SEARCH_BACKEND", backend)
+    response = client.get("/listings/", params={"keyword": keyword, "limit": 100})
+    assert response.status_code == 200
+    assert response.headers.get("X-Search-Backend") == ("memory" if backend == "memory" else None)
+    return sorted(item["id"] for item in response.json())
+
+
+@pytest.mark.parametrize("keyword", ["plumb rep", "rep plumb", "pip fix", "plumbing"])
+def test_memory_index_matches_database(client, monkeypatch, keyword):
+    database = search_ids(client, monkeypatch, "database", keyword)
+    memory = search_ids(client, monkeypatch, "memory", keyword)
+    assert memory == database
+    assert database
+
+
+def indexed(listing_id):
+    return listing_index._documents.get(listing_id)
+
+
+def make_listing(db, user, service, title):
+    listing = models.Listing(user_id=user.id, service_id=service.id, title=title, min_price=10, max_price=50)
+    db.add(listing)
+    db.commit()
+    listing_index.upsert_listing(listing)
+    return listing
+
+
+def test_review_writes_refresh_indexed_ratings(client, db):
+    provider = make_user(db, "rated@example.com", "provider")
+    customer = make_user(db, "rater@example.com", "customer")
+    admin = make_user(db, "admin@example.com", "admin")
+    listing = make_listing(db, provider, make_service(db, "Gardening"), "Hedge trimming")
+    booking = make_booking(db, customer, listing)
+
+    response = client.post("/reviews/", json={"booking_id": booking.id, "rating": 4}, headers=auth_headers(customer.id))
+    assert response.status_code == 200
+    assert (indexed(listing.id)["provider_rating"], indexed(listing.id)["provider_review_count"]) == (4.0, 1)
+
+    review_id = response.json()["id"]
+    response = client.put(f"/reviews/{review_id}", json={"rating": 2}, headers=auth_headers(customer.id))
+    assert response.status_code == 200
+    assert indexed(listing.id)["provider_rating"] == 2.0
+
+    response = client.delete(f"/admin/reviews/{review_id}", headers=auth_headers(admin.id))
+    assert response.status_code == 204
+    assert (indexed(listing.id)["provider_rating"], indexed(listing.id)["provider_review_count"]) == (0.0, 0)
+
+
+def test_service_writes_update_the_index(client, db):
+    provider = make_user(db, "cleaner@example.com", "provider")
+    service = make_service(db, "Cleaning")
+    listing = make_listing(db, provider, service, "Deep clean")
+
+    response = client.put(f"/services/{service.id}", data={"name": "Housekeeping"})
+    assert response.status_code == 200
+    assert indexed(listing.id)["service_name"] == "Housekeeping"
+
+    response = client.delete(f"/services/{service.id}")
+    assert response.status_code == 204
+    assert indexed(listing.id) is None
+
+
+def test_deleting_an_account_removes_its_listings(client, db):
+    provider = make_user(db, "leaving@example.com", "provider")
+    listing = make_listing(db, provider, make_service(db, "Moving"), "Van and driver")
+    assert indexed(listing.id) is not None
+
+    assert client.delete("/me", headers=auth_headers(provider.id)).status_code == 204
+    assert indexed(listing.id) is None
@@ -0,0 +1,57 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app.models as models
+from app.main import app
+from app.utils.ratings import reconcile_ratings
+from tests.helpers import auth_headers, make_booking, make_service, make_user
+
+
+@pytest.fixture(scope="module")
+def client(schema):
+    return TestClient(app)
+
+
+def totals(db, user_id):
+    """(profile count, sum, average) and every listing's (rating, count) for a user"""
+    db.expire_all()
+    profile = db.query(models.Profile).filter_by(user_id=user_id).one()
+    listings = db.query(models.Listing).filter_by(user_id=user_id).all()
+    return (
+        (profile.rating_count, profile.rating_sum, profile.average_rating),
+        {(listing.provider_rating, listing.provider_review_count) for listing in listings},
+    )
+
+
+def test_listing_ratings_follow_review_writes(client, db):
+    provider = make_user(db, "rated@example.com", "provider")
+    service = make_service(db)
+    listings = [models.Listing(user_id=provider.id, service_id=service.id, title=t) for t in ("One", "Two")]
+    db.add_all(listings)
+    db.commit()
+    first = make_booking(db, make_user(db, "first@example.com", "customer"), listings[0])
+    second = make_booking(db, make_user(db, "second@example.com", "customer"), listings[1])
+    admin = make_user(db, "admin@example.com", "admin")
+
+    response = client.post("/reviews/", json={"booking_id": first.id, "rating": 5}, headers=auth_headers(first.customer_id))
+    assert response.status_code == 200
+    review_id = response.json()["id"]
+    assert totals(db, provider.id) == ((1, 5, 5.0), {(5.0, 1)})
+
+    response = client.post(f"/bookings/{second.id}/review", json={"rating": 2}, headers=auth_headers(second.customer_id))
+    assert response.status_code == 200
+    assert totals(db, provider.id) == ((2, 7, 3.5), {(3.5, 2)})
+
+    response = client.put(f"/reviews/{review_id}", json={"rating": 3}, headers=auth_headers(first.customer_id))
+    assert response.status_code == 200
+    assert totals(db, provider.id) == ((2, 5, 2.5), {(2.5, 2)})
+
+    response = client.delete(f"/admin/reviews/{review_id}", headers=auth_headers(admin.id))
+    assert response.status_code == 204
+    assert totals(db, provider.id) == ((1, 2, 2.0), {(2.0, 1)})
+
+    # The incremental totals match a recompute from the reviews table
+    before = totals(db, provider.id)
+    reconcile_ratings(db)
+    db.commit()
+    assert totals(db, provider.id) == before
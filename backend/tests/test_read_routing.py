@@ -0,0 +1,48 @@
+import time
+
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from app.core.read_routing import READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_HEADER, use_replica
+from app.main import app
+
+
+def request(method="GET", headers=None):
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": method, "headers": raw, "path": "/", "query_string": b""})
+
+
+def test_reads_use_the_replica_outside_the_window():
+    assert use_replica(request())
+    assert use_replica(request(headers={READ_YOUR_WRITES_HEADER: f"{time.time() - 1}"}))
+    assert use_replica(request(headers={READ_YOUR_WRITES_HEADER: "garbage"}))
+    assert not use_replica(request("POST"))
+
+
+def test_reads_stay_on_the_primary_inside_the_window():
+    until = f"{time.time() + 5}"
+    assert not use_replica(request(headers={READ_YOUR_WRITES_HEADER: until}))
+    assert not use_replica(request(headers={"Cookie": f"{READ_YOUR_WRITES_COOKIE}={until}"}))
+
+
+@pytest.fixture
+def client(schema):
+    return TestClient(app)
+
+
+def test_only_successful_writes_start_the_window(client):
+    category = {"name": "Repairs", "description": "Fixing things"}
+    response = client.post("/categories/", json=category)
+    assert response.status_code == 201
+    until = float(response.headers[READ_YOUR_WRITES_HEADER])
+    assert time.time() < until
+    assert response.cookies[READ_YOUR_WRITES_COOKIE]
+
+    client.cookies.clear()
+    response = client.put("/categories/999999", json=category)
+    assert response.status_code == 404
+    assert READ_YOUR_WRITES_HEADER not in response.headers
+    assert READ_YOUR_WRITES_COOKIE not in response.cookies
+
+    assert READ_YOUR_WRITES_HEADER not in client.get("/categories/").headers
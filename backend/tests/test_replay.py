@@ -0,0 +1,69 @@
+from app.sockets.replay import ReplayBuffer
+
+
+def seqs(frames):
+    return [frame.message["seq"] for frame in frames]
+
+
+def test_since_replays_the_gap():
+    replay = ReplayBuffer(size=10, max_users=10)
+    replay.track(1)
+    for i in range(5):
+        replay.record(1, {"n": i})
+    frames, complete = replay.since(1, 2, replay.stream)
+    assert seqs(frames) == [3, 4, 5] and complete
+    assert replay.since(1, 5, replay.stream) == ([], True)
+
+
+def test_since_is_incomplete_after_overflow_or_on_another_stream():
+    replay = ReplayBuffer(size=3, max_users=10)
+    replay.track(1)
+    for i in range(6):
+        replay.record(1, {"n": i})
+    frames, complete = replay.since(1, 1)
+    assert seqs(frames) == [4, 5, 6] and not complete
+    assert replay.since(1, 3) == (frames, True)
+    assert replay.since(1, 3, "other-stream") == ([], False)
+    # A sequence number this buffer never issued
+    assert replay.since(1, 99) == ([], False)
+
+
+def test_untracked_users_get_unstamped_messages():
+    replay = ReplayBuffer(size=3, max_users=10)
+    assert "seq" not in replay.record(7, {"n": 1}).message
+    assert replay.since(7, 0) == ([], True)
+    assert replay.since(7, 4) == ([], False)
+
+
+def test_connected_users_are_never_evicted():
+    replay = ReplayBuffer(size=10, max_users=2)
+    replay.track(1)
+    replay.record(1, {"n": 1})
+    for user_id in (2, 3, 4):
+        replay.track(user_id)
+        replay.untrack(user_id)
+    assert len(replay) == 2
+    replay.record(1, {"n": 2})
+    frames, complete = replay.since(1, 0, replay.stream)
+    assert seqs(frames) == [1, 2] and complete
+
+
+def test_evicted_history_does_not_restart_the_sequence():
+    replay = ReplayBuffer(size=10, max_users=1)
+    replay.track(1)
+    for i in range(3):
+        replay.record(1, {"n": i})
+    replay.untrack(1)
+    # User 2 pushes user 1 out; user 1 then reconnects in a new tab (no last_seq)
+    replay.track(2)
+    replay.untrack(2)
+    replay.track(1)
+    start = replay.latest(1)
+    assert start > 3
+    for i in range(5):
+        replay.record(1, {"n": i})
+    # The old tab still holds seq 3: whatever was sent while evicted is lost
+    frames, complete = replay.since(1, 3, replay.stream)
+    assert not complete
+    assert seqs(frames) == list(range(start + 1, start + 6))
+    assert replay.since(1, start, replay.stream)[1]
@@ -0,0 +1,95 @@
+import asyncio
+
+from app.core.config import Config
+from app.core.metrics import websocket_evictions_total
+from app.sockets.backplane import InMemoryBackplane
+from app.sockets.socket_manager import SocketManager
+
+
+class FakeWebSocket:
+    """Records what is sent; `stalled` blocks every send until released"""
+    def __init__(self, stalled: bool = False):
+        self.sent = []
+        self.closed_with = None
+        self.released = asyncio.Event()
+        if not stalled:
+            self.released.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        await self.released.wait()
+        self.sent.append(data)
+
+    async def send_bytes(self, data):
+        await self.send_text(data)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def settle():
+    await asyncio.sleep(0.01)
+
+
+def run(scenario):
+    """Run a scenario(manager) and disconnect its sockets afterwards"""
+    async def main():
+        manager = SocketManager(InMemoryBackplane("test"))
+        try:
+            await scenario(manager)
+        finally:
+            await settle()
+            for socket_id in list(manager.active_connections):
+                await manager.disconnect(socket_id)
+
+    asyncio.run(main())
+
+
+def test_full_queue_evicts_the_socket(monkeypatch):
+    monkeypatch.setattr(Config, "SOCKET_SEND_QUEUE_SIZE", 2)
+
+    async def scenario(manager):
+        slow, fast = FakeWebSocket(stalled=True), FakeWebSocket()
+        await manager.connect(slow, "slow", user_id=1)
+        await manager.connect(fast, "fast", user_id=1)
+        before = websocket_evictions_total.value(reason="queue_full")
+        for i in range(4):
+            await manager.broadcast_to_user(1, {"type": "notification", "n": i})
+            await settle()
+        assert "slow" not in manager.active_connections
+        assert slow.closed_with == 1013
+        assert websocket_evictions_total.value(reason="queue_full") == before + 1
+        # The other socket got everything, and the eviction task was released
+        assert len(fast.sent) == 5
+        assert not manager._tasks
+
+    run(scenario)
+
+
+def test_blocked_send_evicts_the_socket(monkeypatch):
+    monkeypatch.setattr(Config, "SOCKET_SEND_TIMEOUT_SECONDS", 0.05)
+
+    async def scenario(manager):
+        stalled = FakeWebSocket(stalled=True)
+        await manager.connect(stalled, "stalled", user_id=2)
+        before = websocket_evictions_total.value(reason="send_timeout")
+        await asyncio.sleep(0.2)
+        assert "stalled" not in manager.active_connections
+        assert websocket_evictions_total.value(reason="send_timeout") == before + 1
+
+    run(scenario)
+
+
+def test_scheduled_broadcasts_are_held_until_done():
+    async def scenario(manager):
+        socket = FakeWebSocket()
+        await manager.connect(socket, "s", user_id=3)
+        manager.schedule_broadcast(3, {"type": "notification"})
+        assert len(manager._tasks) == 1
+        await settle()
+        assert not manager._tasks
+        assert len(socket.sent) == 2
+
+    run(scenario)
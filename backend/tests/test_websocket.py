@@ -0,0 +1,77 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from starlette.websockets import WebSocketDisconnect
+
+from app.database import SessionLocal
+from app.main import app
+from app.sockets.socket_manager import socket_manager
+from app.utils.auth import create_access_token
+from tests.helpers import make_user
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+@pytest.fixture(scope="module")
+def client(schema):
+    # With the lifespan, so the socket manager runs on the client's event loop
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def user_id(client):
+    db = SessionLocal()
+    user_id = make_user(db, "listener@example.com", "customer").id
+    db.close()
+    return user_id
+
+
+def token(user_id):
+    return create_access_token({"sub": str(user_id)})
+
+
+def broadcast(client, user_id, message):
+    client.portal.call(socket_manager.broadcast_to_user, user_id, message)
+
+
+def test_broadcasts_are_sequenced_and_replayed(client, user_id):
+    with client.websocket_connect(f"/ws?token={token(user_id)}") as ws:
+        hello = ws.receive_json()
+        assert hello["type"] == "connection_established"
+        broadcast(client, user_id, {"type": "notification", "n": 1})
+        first = ws.receive_json()
+        assert first["n"] == 1 and first["seq"] == hello["seq"] + 1
+
+    # Sent while the user is away, kept for replay
+    for n in (2, 3):
+        broadcast(client, user_id, {"type": "notification", "n": n})
+
+    with client.websocket_connect(f"/ws?token={token(user_id)}&last_seq={first['seq']}&stream={hello['stream']}") as ws:
+        assert ws.receive_json()["type"] == "connection_established"
+        assert [ws.receive_json()["n"] for _ in range(2)] == [2, 3]
+        assert ws.receive_json() == {"type": "replay_complete", "replayed": 2, "complete": True}
+
+    # Another worker's (or a restarted worker's) sequence cannot be replayed
+    with client.websocket_connect(f"/ws?token={token(user_id)}&last_seq={first['seq']}&stream=elsewhere") as ws:
+        ws.receive_json()
+        assert ws.receive_json() == {"type": "replay_complete", "replayed": 0, "complete": False}
+
+
+@pytest.mark.skipif(msgpack is None, reason="msgpack is not installed")
+def test_msgpack_clients_get_binary_frames(client, user_id):
+    with client.websocket_connect(f"/ws?token={token(user_id)}&encoding=msgpack") as ws:
+        hello = msgpack.unpackb(ws.receive_bytes())
+        assert hello["encoding"] == "msgpack"
+        broadcast(client, user_id, {"type": "notification", "n": 4})
+        assert msgpack.unpackb(ws.receive_bytes())["n"] == 4
+
+
+def test_invalid_tokens_are_refused(client):
+    with pytest.raises(WebSocketDisconnect) as refused:
+        with client.websocket_connect("/ws?token=not-a-token") as ws:
+            ws.receive_json()
+    assert refused.value.code == 1008